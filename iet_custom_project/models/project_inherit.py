@@ -28,13 +28,13 @@ class Project(models.Model):
     devlop_team_id = fields.Many2one('project.team', string='Development Team', tracking=True, ondelete='set null')
     team_helpdesk_id = fields.Many2one('team.helpdesk', string='Team', tracking=True, ondelete='set null')
     start_project_date = fields.Date("Start Project Date", required=False, tracking=True)
-    end_project_date = fields.Date("End Project Date", required=False, tracking=True)
+    end_project_date = fields.Date("End Project Date", required=False, tracking=True, index=True)
 
     free_support_start_date = fields.Date("Free Support Start Date", tracking=True)
-    free_support_end_date = fields.Date("Free Support End Date", tracking=True)
+    free_support_end_date = fields.Date("Free Support End Date", tracking=True, index=True)
 
     contract_project_start_date = fields.Date("Contract Project Start Date", tracking=True)
-    contract_project_end_date = fields.Date("Contract Project End Date", tracking=True)
+    contract_project_end_date = fields.Date("Contract Project End Date", tracking=True, index=True)
 
     industry_id = fields.Many2one('project.industry', string='Industry', tracking=True)
     implementation_owner_ids = fields.Many2many(
@@ -1 +1 @@
-from . import models
\ No newline at end of file
+from . import models
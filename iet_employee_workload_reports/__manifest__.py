@@ -60,6 +60,7 @@
         'hr_holidays',
         'hr_timesheet',
         'iet_project_system',
+        'iet_reminder_ledger',
     ],
     'data': [
         'security/ir.model.access.csv',
@@ -67,9 +68,19 @@
         'views/employee_workload_views.xml',
         'views/employee_per_project_views.xml',
         'views/planned_vs_actual_views.xml',
+        'views/workload_analysis_views.xml',
+        'views/utilization_views.xml',
         'views/reports_menu.xml',
         'data/ir_cron.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'iet_employee_workload_reports/static/src/js/report_progress_field.esm.js',
+        ],
+    },
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'demo': [],
     'installable': True,
     'application': False,
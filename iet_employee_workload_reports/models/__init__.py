@@ -1,4 +1,8 @@
+from . import capacity_engine
+from . import report_job
 from . import employee_workload_report
 from . import per_project
 from . import planned_vs_actual
-from . import project
\ No newline at end of file
+from . import project
+from . import workload_analysis
+from . import utilization
@@ -0,0 +1,168 @@
+from odoo import models, api
+from datetime import datetime, time
+import numpy as np
+
+# Friday and Saturday are never working days in the workload reports
+WEEKEND_DAYS = (4, 5)
+
+
+class EmployeeCapacityEngine(models.AbstractModel):
+    """Employees × days matrix of working hours, shared by the workload reports."""
+    _name = 'employee.capacity.engine'
+    _description = 'Employee Capacity Engine'
+
+    @api.model
+    def _get_capacity_hours(self, employees, date_from, date_to):
+        """Capacity hours of each employee over the period, keyed by employee id."""
+        matrix = self._get_capacity_matrix(employees, date_from, date_to)
+        return dict(zip(employees.ids, matrix.sum(axis=1).tolist()))
+
+    @api.model
+    def _get_capacity_by_bucket(self, employees, date_from, date_to, bucket_starts):
+        """Capacity hours of ``employees`` (rows) summed per bucket (columns).
+
+        ``bucket_starts`` are the sorted first days of consecutive buckets; the
+        first one may fall before ``date_from`` and the last one ends at ``date_to``.
+        """
+        matrix = self._get_capacity_matrix(employees, date_from, date_to)
+        if not matrix.size:
+            return np.zeros((len(employees), len(bucket_starts)))
+        offsets = np.array([max((start - date_from).days, 0) for start in bucket_starts])
+        return np.add.reduceat(matrix, offsets, axis=1)
+
+    @api.model
+    def _get_load_status(self, load_percentage):
+        """Under < 80% <= Normal < 100% <= Overload."""
+        if load_percentage >= 100:
+            return 'overload'
+        if load_percentage >= 80:
+            return 'normal'
+        return 'under'
+
+    @api.model
+    def _get_capacity_matrix(self, employees, date_from, date_to):
+        """Working hours of ``employees`` (rows) on each day of the period (columns).
+
+        Hours come from the weekly pattern of each employee's calendar, minus
+        the public holidays of that calendar and the validated time off.
+        Employees without calendar, in a company without default calendar,
+        get no capacity.
+        """
+        ordinals = np.arange(date_from.toordinal(), date_to.toordinal() + 1)
+        if not employees or not len(ordinals):
+            return np.zeros((len(employees), len(ordinals)))
+
+        default_calendar = self.env.company.resource_calendar_id
+        calendars = employees.resource_calendar_id | default_calendar
+        calendar_index = {calendar.id: index for index, calendar in enumerate(calendars)}
+
+        # One row of daily hours per calendar, holidays already removed, then
+        # a zero row for employees without calendar when the company has none
+        weekdays = (ordinals - 1) % 7
+        week_types = ((ordinals - 1) // 7) % 2
+        calendar_hours = np.stack([
+            self._get_calendar_pattern(calendar)[week_types, weekdays] for calendar in calendars
+        ] + [np.zeros(len(ordinals))])
+        calendar_hours[:len(calendars)][self._get_public_holiday_mask(calendars, date_from, date_to)] = 0
+
+        # Broadcast the calendar rows to one row per employee
+        no_calendar_row = len(calendars)
+        rows = np.array([
+            calendar_index.get((employee.resource_calendar_id or default_calendar).id, no_calendar_row)
+            for employee in employees
+        ])
+        matrix = calendar_hours[rows]
+        return self._deduct_time_off(matrix, employees, date_from, date_to)
+
+    @api.model
+    def _get_calendar_pattern(self, calendar):
+        """Hours per (week type, weekday); both week types match for one-week calendars."""
+        pattern = np.zeros((2, 7))
+        for attendance in calendar.attendance_ids:
+            if attendance.day_period == 'lunch' or attendance.display_type:
+                continue
+            hours = attendance.hour_to - attendance.hour_from
+            day = int(attendance.dayofweek)
+            if calendar.two_weeks_calendar:
+                pattern[int(attendance.week_type), day] += hours
+            else:
+                pattern[:, day] += hours
+        pattern[:, WEEKEND_DAYS] = 0
+        return pattern
+
+    @api.model
+    def _day_range_mask(self, row_count, rows, starts, ends, day_count):
+        """Boolean (row_count × day_count) mask covering [start, end] for each (row, start, end)."""
+        diff = np.zeros((row_count, day_count + 1), dtype=np.int32)
+        np.add.at(diff, (rows, starts), 1)
+        np.add.at(diff, (rows, ends + 1), -1)
+        return np.cumsum(diff, axis=1)[:, :-1] > 0
+
+    @api.model
+    def _clip_ranges(self, ranges, date_from, date_to):
+        """Day indexes of (row, start_date, end_date) ranges clipped to the period."""
+        day_count = (date_to - date_from).days + 1
+        rows, starts, ends = [], [], []
+        for row, start, end in ranges:
+            start_index = max((start - date_from).days, 0)
+            end_index = min((end - date_from).days, day_count - 1)
+            if start_index <= end_index:
+                rows.append(row)
+                starts.append(start_index)
+                ends.append(end_index)
+        return np.array(rows, dtype=int), np.array(starts, dtype=int), np.array(ends, dtype=int)
+
+    @api.model
+    def _get_public_holiday_mask(self, calendars, date_from, date_to):
+        """Public holidays (leaves without resource) of each calendar, as a calendars × days mask."""
+        day_count = (date_to - date_from).days + 1
+        calendar_index = {calendar.id: index for index, calendar in enumerate(calendars)}
+        holidays = self.env['resource.calendar.leaves'].sudo().search_read([
+            ('resource_id', '=', False),
+            '|', ('calendar_id', 'in', calendars.ids), ('calendar_id', '=', False),
+            ('date_from', '<=', datetime.combine(date_to, time.max)),
+            ('date_to', '>=', datetime.combine(date_from, time.min)),
+        ], ['calendar_id', 'date_from', 'date_to'])
+
+        ranges = []
+        for holiday in holidays:
+            # Company-wide holidays (no calendar) apply to every calendar
+            indexes = ([calendar_index[holiday['calendar_id'][0]]] if holiday['calendar_id']
+                       else list(calendar_index.values()))
+            for index in indexes:
+                ranges.append((index, holiday['date_from'].date(), holiday['date_to'].date()))
+        rows, starts, ends = self._clip_ranges(ranges, date_from, date_to)
+        return self._day_range_mask(len(calendars), rows, starts, ends, day_count)
+
+    @api.model
+    def _deduct_time_off(self, matrix, employees, date_from, date_to):
+        """Remove validated time off: whole days are zeroed, single partial days lose their hours."""
+        day_count = matrix.shape[1]
+        employee_index = {employee_id: index for index, employee_id in enumerate(employees.ids)}
+        leaves = self.env['hr.leave'].sudo().search_read([
+            ('employee_id', 'in', employees.ids),
+            ('state', '=', 'validate'),
+            ('request_date_from', '<=', date_to),
+            ('request_date_to', '>=', date_from),
+        ], ['employee_id', 'request_date_from', 'request_date_to', 'request_unit_half',
+            'request_unit_hours', 'number_of_hours'])
+
+        full_days = []
+        partial_rows, partial_days, partial_hours = [], [], []
+        for leave in leaves:
+            row = employee_index[leave['employee_id'][0]]
+            start, end = leave['request_date_from'], leave['request_date_to']
+            if (leave['request_unit_half'] or leave['request_unit_hours']) and start == end:
+                partial_rows.append(row)
+                partial_days.append((start - date_from).days)
+                partial_hours.append(leave['number_of_hours'])
+            else:
+                full_days.append((row, start, end))
+
+        rows, starts, ends = self._clip_ranges(full_days, date_from, date_to)
+        matrix = np.where(self._day_range_mask(len(employees), rows, starts, ends, day_count), 0.0, matrix)
+        if partial_rows:
+            deduction = np.zeros_like(matrix)
+            np.add.at(deduction, (np.array(partial_rows), np.array(partial_days)), np.array(partial_hours))
+            matrix = np.clip(matrix - deduction, 0, None)
+        return matrix
@@ -1,20 +1,35 @@
 from odoo import models, fields, api
+from collections import defaultdict
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from odoo.tools import split_every
+from odoo.tools.sql import SQL
+from .report_job import REPORT_CHUNK_SIZE
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Timesheets written by transactions still running when a generation starts
+# have an older write_date; they are re-checked by the next generation.
+SOURCE_WATERMARK_MARGIN = timedelta(hours=1)
+
 
 class EmployeeWorkloadReport(models.Model):
     _name = 'employee.workload.report'
+    _inherit = ['workload.report.job']
     _description = 'Employee Workload Report'
     _order = 'create_date desc'
 
     name = fields.Char(string='Report Name', required=True)
     project_ids = fields.Many2many('project.project', string='Projects')
     employee_id = fields.Many2one('hr.employee', string='Employee')
+    date_from = fields.Date(string='From Date', help="With To Date, limits timesheets to the period and computes the load of each employee.")
+    date_to = fields.Date(string='To Date')
     line_ids = fields.One2many('employee.workload.report.line', 'report_id', string='Workload Lines')
+    source_write_date = fields.Datetime(
+        string='Data As Of', readonly=True, copy=False,
+        help="Start of the last generation, minus a safety margin. Generating again only "
+             "recomputes the hours of the projects whose timesheets changed after it.")
 
     @api.model
     def default_get(self, fields_list):
@@ -25,9 +40,29 @@ class EmployeeWorkloadReport(models.Model):
         })
         return res
 
-    def action_generate_report(self):
+    def write(self, vals):
+        # تغيير الموظف أو الفترة يغيّر كل السطور: التحديث التالي يعيد البناء بالكامل
+        if {'employee_id', 'date_from', 'date_to'} & set(vals):
+            vals = dict(vals, source_write_date=False)
+        return super().write(vals)
+
+    def _clear_partial_results(self):
+        # التحديث التالي يعيد البناء بالكامل
+        super()._clear_partial_results()
+        self.source_write_date = False
+
+    def _generate_report(self):
+        """Generate the report, or refresh it incrementally once generated.
+
+        The report keeps a watermark (``source_write_date``) of its inputs.
+        Hours of a project are recomputed only when its timesheets changed
+        since then, or when its timesheet count differs (deleted timesheets). Schedule metrics depend on today and the
+        load % of employees on time off and calendars, so both are recomputed
+        for every project; lines are only written when a value actually
+        changed. Projects are processed in chunks of
+        ``REPORT_CHUNK_SIZE`` with a committed progress update after each.
+        """
         self.ensure_one()
-        self.line_ids.unlink()
 
         # تحديد المشاريع المستهدفة
         project_domain = []
@@ -36,85 +71,229 @@ class EmployeeWorkloadReport(models.Model):
 
         projects = self.env['project.project'].search(project_domain)
 
+        timesheet_domain = [('project_id', 'in', projects.ids), ('employee_id', '!=', False)]
+        if self.employee_id:
+            timesheet_domain.append(('employee_id', '=', self.employee_id.id))
+        if self.date_from and self.date_to:
+            timesheet_domain += [('date', '>=', self.date_from), ('date', '<=', self.date_to)]
+
+        watermark = self._get_source_watermark()
+        if self.source_write_date:
+            stale_projects = self._get_stale_projects(projects, timesheet_domain)
+        else:
+            self.line_ids.unlink()
+            stale_projects = projects
+
+        # سطور مشاريع خرجت من التقرير
+        self.line_ids.filtered(lambda line: line.project_id not in projects).unlink()
+
+        created = updated = 0
+        for done, chunk_ids in enumerate(split_every(REPORT_CHUNK_SIZE, projects.ids), 1):
+            chunk = projects.browse(chunk_ids)
+            vals_list = self._prepare_line_vals(chunk, chunk & stale_projects, timesheet_domain)
+            chunk_created, chunk_updated = self._upsert_lines(chunk, chunk & stale_projects, vals_list)
+            created += chunk_created
+            updated += chunk_updated
+            self._set_progress(min(done * REPORT_CHUNK_SIZE, len(projects)), len(projects))
+        self.source_write_date = watermark
+
+        _logger.info("Workload report %s: %d/%d projects recomputed, %d lines created, %d updated",
+                     self.id, len(stale_projects), len(projects), created, updated)
+        return True
+
+    def _prepare_line_vals(self, projects, stale_projects, timesheet_domain):
+        """Values of the project lines of ``projects`` and of the employee lines of ``stale_projects``."""
+        # ساعات كل موظف في كل مشروع في استعلام واحد
+        ts_data = []
+        timesheet_counts = {}
+        if stale_projects:
+            stale_domain = timesheet_domain + [('project_id', 'in', stale_projects.ids)]
+            ts_data = self.env['account.analytic.line']._read_group(
+                stale_domain,
+                ['project_id', 'employee_id'],
+                ['unit_amount:sum', '__count'],
+            )
+        hours_by_project = defaultdict(list)
+        for project, employee, assigned_hours, count in ts_data:
+            hours_by_project[project.id].append((employee.id, assigned_hours))
+            timesheet_counts[project.id] = timesheet_counts.get(project.id, 0) + count
+
+        # نسبة التحميل تحتاج فترة لحساب السعة
+        CapacityEngine = self.env['employee.capacity.engine']
+        capacity_by_employee = {}
+        if self.date_from and self.date_to:
+            # السعة تتغير مع الإجازات والتقويم بدون أي تغيير في التايم شيت:
+            # نعيد حساب الـ load لموظفي المشاريع غير المتغيرة من ساعاتهم المحفوظة
+            fresh_ids = set((projects - stale_projects).ids)
+            for line in self.line_ids:
+                if not line.is_project_line and line.project_id.id in fresh_ids:
+                    hours_by_project[line.project_id.id].append((line.employee_id.id, line.assigned_hours))
+            employee_ids = {employee_id for hours in hours_by_project.values() for employee_id, _hours in hours}
+            if employee_ids:
+                employees = self.env['hr.employee'].browse(employee_ids)
+                capacity_by_employee = CapacityEngine._get_capacity_hours(employees, self.date_from, self.date_to)
+
+        metrics_by_project = self._calculate_projects_metrics(projects)
+
+        vals_list = []
         for project in projects:
-            metrics = self._calculate_project_metrics(project)
             project_vals = {
                 'report_id': self.id,
                 'project_id': project.id,
                 'is_project_line': True,
                 'status': 'normal',
-                **metrics
+                **metrics_by_project[project.id]
             }
-            self.env['employee.workload.report.line'].create(project_vals)
-
-            timesheet_domain = [('project_id', '=', project.id), ('employee_id', '!=', False)]
-            if self.employee_id:
-                timesheet_domain.append(('employee_id', '=', self.employee_id.id))
-
-            ts_data = self.env['account.analytic.line'].read_group(
-                timesheet_domain,
-                ['unit_amount'],
-                ['employee_id']
-            )
-
-            for data in ts_data:
-                employee = self.env['hr.employee'].browse(data['employee_id'][0])
-                assigned_hours = data['unit_amount']
-
-                self.env['employee.workload.report.line'].create({
+            if project in stale_projects:
+                project_vals['timesheet_count'] = timesheet_counts.get(project.id, 0)
+            vals_list.append(project_vals)
+            for employee_id, assigned_hours in hours_by_project[project.id]:
+                load_vals = {'status': 'normal'}
+                if employee_id in capacity_by_employee:
+                    capacity_hours = capacity_by_employee[employee_id]
+                    load_percentage = (assigned_hours / capacity_hours * 100) if capacity_hours > 0 else 0
+                    load_vals = {
+                        'load_percentage': load_percentage,
+                        'status': CapacityEngine._get_load_status(load_percentage),
+                    }
+                vals_list.append({
                     'report_id': self.id,
                     'project_id': project.id,
-                    'employee_id': employee.id,
+                    'employee_id': employee_id,
                     'assigned_hours': assigned_hours,
                     'is_project_line': False,
-                    'status': 'normal',
+                    **load_vals
                 })
+        return vals_list
 
-        return True
+    def _upsert_lines(self, projects, stale_projects, vals_list):
+        """Create, update or remove the lines of ``projects`` so they match ``vals_list``.
 
-    def _count_working_days(self, start_date, end_date):
-        if not start_date or not end_date:
-            return 0
-        if start_date > end_date:
-            return 0
+        Employee lines are only removed from stale projects.
+        Returns the number of created and updated lines.
+        """
+        Line = self.env['employee.workload.report.line']
+        project_ids = set(projects.ids)
+        lines_by_key = {
+            (line.project_id.id, line.employee_id.id): line
+            for line in self.line_ids if line.project_id.id in project_ids
+        }
 
-        days = 0
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.weekday() not in (4, 5):  # 4=Friday, 5=Saturday
-                days += 1
-            current_date += timedelta(days=1)
-        return days
+        to_create = []
+        to_write = defaultdict(list)  # changed fields -> [(line id, changes)]
+        seen = set()
+        for vals in vals_list:
+            key = (vals['project_id'], vals.get('employee_id', False))
+            seen.add(key)
+            line = lines_by_key.get(key)
+            if not line:
+                to_create.append(vals)
+                continue
+            changes = {
+                fname: value for fname, value in vals.items()
+                if fname not in ('report_id', 'project_id', 'employee_id')
+                and line[fname] != self._to_record_value(line, fname, value)
+            }
+            if changes:
+                to_write[tuple(sorted(changes))].append((line.id, changes))
 
-    def _calculate_project_metrics(self, project):
-        today = fields.Date.today()
+        # استعلام UPDATE واحد لكل مجموعة حقول متغيرة
+        updated = 0
+        for fnames, rows in to_write.items():
+            self._bulk_update_lines(Line, fnames, rows)
+            updated += len(rows)
 
-        planned_duration = self._count_working_days(project.date_start, project.date)
+        # موظفين لم يعد لهم ساعات في المشروع
+        stale_ids = set(stale_projects.ids)
+        obsolete = Line.browse([
+            line.id for key, line in lines_by_key.items()
+            if key[0] in stale_ids and key not in seen
+        ])
+        obsolete.unlink()
 
-        end_count = project.date_stop_workload or today
-        days_passed = self._count_working_days(project.date_start, end_count)
+        Line.create(to_create)
+        return len(to_create), updated
 
-        expected_progress = 0
-        if planned_duration > 0:
-            expected_progress = min((days_passed / planned_duration) * 100, 100.0)
+    @api.model
+    def _bulk_update_lines(self, Line, fnames, rows):
+        """Write ``rows`` of ``(line id, changes)``, all changing ``fnames``, in one UPDATE ... FROM (VALUES ...)."""
+        Line.flush_model(fnames)
+        fields_ = [Line._fields[fname] for fname in fnames]
+        values = SQL(", ").join(
+            SQL("(%s)", SQL(", ").join([
+                SQL("%s", line_id),
+                *(SQL("%s", field.convert_to_column(changes[field.name], Line)) for field in fields_),
+            ]))
+            for line_id, changes in rows
+        )
+        assignments = SQL(", ").join(
+            SQL("%s = v.%s::%s", SQL.identifier(field.name), SQL.identifier(field.name), SQL(field.column_type[1]))
+            for field in fields_
+        )
+        columns = SQL(", ").join(SQL.identifier(name) for name in ('id', *fnames))
+        self.env.cr.execute(SQL(
+            """UPDATE %s SET %s, write_uid = %s, write_date = NOW() AT TIME ZONE 'UTC'
+                 FROM (VALUES %s) AS v(%s)
+                WHERE %s.id = v.id::int""",
+            SQL.identifier(Line._table), assignments, self.env.uid,
+            values, columns, SQL.identifier(Line._table),
+        ))
+        lines = Line.browse([line_id for line_id, _changes in rows])
+        lines.invalidate_recordset([*fnames, 'write_uid', 'write_date'])
+        lines.modified(fnames)
 
-        actual_progress = project.completion_percent if hasattr(project, 'completion_percent') else 0
-        delay_days = project.all_delay_days
+    @api.model
+    def _to_record_value(self, line, fname, value):
+        """``value`` as ``line[fname]`` would return it once written (rounded floats, records)."""
+        field = line._fields[fname]
+        return field.convert_to_record(field.convert_to_cache(value, line), line)
 
-        if delay_days >= project.threshold_on_track and delay_days < project.threshold_at_risk:
-            schedule_status = 'on_track'
-        elif delay_days == project.threshold_at_risk and delay_days < project.threshold_delayed:
-            schedule_status = 'at_risk'
-        else:
-            schedule_status = 'delayed'
+    def _get_source_watermark(self):
+        """Transaction start minus ``SOURCE_WATERMARK_MARGIN``, read before the timesheets.
+
+        A MAX(write_date) would skip rows committed later by transactions that
+        started before it was read.
+        """
+        return self.env.cr.now() - SOURCE_WATERMARK_MARGIN
+
+    def _get_stale_projects(self, projects, timesheet_domain):
+        """Projects of the report whose timesheets changed since the watermark.
+
+        Only the hours depend on the previous generation: the schedule metrics
+        are read again for every project, so project and plan line writes
+        (e.g. the nightly schedule refresh) do not make a project stale.
+        """
+        self.env['account.analytic.line'].flush_model(['project_id', 'write_date'])
+        self.env.cr.execute("""
+            SELECT DISTINCT project_id FROM account_analytic_line
+             WHERE project_id = ANY(%(ids)s) AND write_date > %(since)s
+        """, {'ids': projects.ids, 'since': self.source_write_date})
+        stale_ids = {row[0] for row in self.env.cr.fetchall()}
 
+        # حذف التايم شيت لا يغيّر write_date: نقارن العدد المحفوظ في سطر المشروع
+        counts = dict(self.env['account.analytic.line']._read_group(
+            timesheet_domain, ['project_id'], ['__count'],
+        ))
+        project_lines = {line.project_id.id: line for line in self.line_ids if line.is_project_line}
+        for project in projects:
+            line = project_lines.get(project.id)
+            if not line or line.timesheet_count != counts.get(project, 0):
+                stale_ids.add(project.id)
+        return projects.filtered(lambda p: p.id in stale_ids)
+
+    def _calculate_projects_metrics(self, projects):
+        """Schedule metrics of every project, keyed by project id."""
+        return {project.id: self._calculate_project_metrics(project) for project in projects}
+
+    def _calculate_project_metrics(self, project):
+        # المؤشرات مخزنة على المشروع (project._compute_schedule_metrics)
         return {
-            'planned_duration': planned_duration,
-            'days_passed': days_passed,
-            'expected_progress': expected_progress,
-            'actual_progress': actual_progress,
-            'delay_days': delay_days,
-            'schedule_status': schedule_status
+            'planned_duration': project.planned_duration,
+            'days_passed': project.days_passed,
+            'expected_progress': project.expected_progress,
+            'actual_progress': project.completion_percent,
+            'delay_days': project.all_delay_days,
+            'schedule_status': project.schedule_status,
         }
 
 
@@ -141,6 +320,7 @@ class EmployeeWorkloadReportLine(models.Model):
     ], string='Schedule Status')
 
     assigned_hours = fields.Float(string='Assigned Hours', digits=(10, 2))
+    timesheet_count = fields.Integer(string='Timesheets', readonly=True)
     load_percentage = fields.Float(string='Load %', digits=(10, 2))
     status = fields.Selection([
         ('under', 'Under'),
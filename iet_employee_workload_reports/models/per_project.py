@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from odoo.tools import split_every
+from .report_job import REPORT_CHUNK_SIZE
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -9,6 +11,7 @@ _logger = logging.getLogger(__name__)
 class EmployeePerProjectReport(models.Model):
     """تقرير حمل الموظفين حسب المشروع"""
     _name = 'employee.per.project.report'
+    _inherit = ['workload.report.job']
     _description = 'Employee Per Project Report'
     _order = 'date_from desc'
 
@@ -31,102 +34,59 @@ class EmployeePerProjectReport(models.Model):
         })
         return res
 
-    def action_generate_report(self):
+    def _generate_report(self):
         """توليد تقرير الموظفين حسب المشروع"""
         self.ensure_one()
         self.line_ids.unlink()
 
-        # جلب الموظفين النشطين
-        employees = self.env['hr.employee'].search([('active', '=', True)])
-
-        for employee in employees:
-            # حساب ساعات السعة الإجمالية للموظف
-            capacity_hours = self._calculate_capacity_hours(employee)
-
-            # جلب المشاريع التي عمل عليها الموظف في هذه الفترة
-            timesheets = self.env['account.analytic.line'].search([
-                ('employee_id', '=', employee.id),
-                ('date', '>=', self.date_from),
-                ('date', '<=', self.date_to),
-                ('project_id', '!=', False),
-            ])
-
-            # تجميع الساعات حسب المشروع
-            project_hours = {}
-            for timesheet in timesheets:
-                project_id = timesheet.project_id.id
-                if project_id not in project_hours:
-                    project_hours[project_id] = 0
-                project_hours[project_id] += timesheet.unit_amount
-
-            # إنشاء سطر لكل مشروع
-            for project_id, assigned_hours in project_hours.items():
-                load_percentage = (assigned_hours / capacity_hours * 100) if capacity_hours > 0 else 0
-
-                # تحديد الحالة
-                if load_percentage >= 100:
-                    status = 'overload'
-                elif load_percentage >= 80:
-                    status = 'normal'
-                else:
-                    status = 'under'
-
-                self.env['employee.per.project.report.line'].create({
-                    'report_id': self.id,
-                    'employee_id': employee.id,
-                    'project_id': project_id,
-                    'capacity_hours': capacity_hours,
-                    'assigned_hours': assigned_hours,
-                    'load_percentage': load_percentage,
-                    'status': status,
-                })
+        # ساعات كل موظف نشط في كل مشروع خلال الفترة في استعلام واحد
+        ts_data = self.env['account.analytic.line']._read_group([
+            ('employee_id.active', '=', True),
+            ('date', '>=', self.date_from),
+            ('date', '<=', self.date_to),
+            ('project_id', '!=', False),
+        ], ['employee_id', 'project_id'], ['unit_amount:sum'])
+        if not ts_data:
+            return True
+
+        employees = self.env['hr.employee'].browse({employee.id for employee, _project, _hours in ts_data})
+        capacity_by_employee = self._calculate_capacity_hours_batch(employees)
+        CapacityEngine = self.env['employee.capacity.engine']
+
+        vals_list = []
+        for employee, project, assigned_hours in ts_data:
+            capacity_hours = capacity_by_employee[employee.id]
+            load_percentage = (assigned_hours / capacity_hours * 100) if capacity_hours > 0 else 0
+
+            # تحديد الحالة
+            status = CapacityEngine._get_load_status(load_percentage)
+
+            vals_list.append({
+                'report_id': self.id,
+                'employee_id': employee.id,
+                'project_id': project.id,
+                'capacity_hours': capacity_hours,
+                'assigned_hours': assigned_hours,
+                'load_percentage': load_percentage,
+                'status': status,
+            })
+
+        # الإنشاء على دفعات مع تحديث نسبة التقدم
+        done = 0
+        for chunk in split_every(REPORT_CHUNK_SIZE, vals_list, list):
+            self.env['employee.per.project.report.line'].create(chunk)
+            done += len(chunk)
+            self._set_progress(done, len(vals_list))
 
         return True
 
+    def _calculate_capacity_hours_batch(self, employees):
+        """حساب ساعات السعة لكل الموظفين دفعة واحدة (employee.capacity.engine)"""
+        return self.env['employee.capacity.engine']._get_capacity_hours(employees, self.date_from, self.date_to)
+
     def _calculate_capacity_hours(self, employee):
         """حساب ساعات السعة للموظف"""
-        calendar = employee.resource_calendar_id or self.env.company.resource_calendar_id
-
-        total_hours = 0
-        current_date = self.date_from
-        while current_date <= self.date_to:
-            # تجاهل الجمعة (4) والسبت (5)
-            if current_date.weekday() not in (4, 5):
-                start_dt = datetime.combine(current_date, datetime.min.time())
-                end_dt = datetime.combine(current_date, datetime.max.time())
-                hours = calendar.get_work_hours_count(start_dt, end_dt, compute_leaves=False)
-                total_hours += hours
-            current_date += timedelta(days=1)
-
-        # خصم إجازات الموظف
-        leave_hours = self._calculate_leave_hours(employee)
-        return total_hours - leave_hours
-
-    def _calculate_leave_hours(self, employee):
-        """حساب ساعات الإجازات"""
-        leaves = self.env['hr.leave'].search([
-            ('employee_id', '=', employee.id),
-            ('state', '=', 'validate'),
-            ('date_from', '<=', self.date_to),
-            ('date_to', '>=', self.date_from),
-        ])
-
-        total_hours = 0
-        for leave in leaves:
-            start = max(leave.date_from.date(), self.date_from)
-            end = min(leave.date_to.date(), self.date_to)
-
-            if start <= end:
-                calendar = employee.resource_calendar_id or self.env.company.resource_calendar_id
-                hours = calendar.get_work_hours_count(
-                    datetime.combine(start, datetime.min.time()),
-                    datetime.combine(end, datetime.max.time()),
-                    compute_leaves=False,
-                    domain=[('calendar_id', '=', calendar.id)]
-                )
-                total_hours += hours
-
-        return total_hours
+        return self._calculate_capacity_hours_batch(employee)[employee.id]
 
 
 class EmployeePerProjectReportLine(models.Model):
@@ -1,5 +1,7 @@
 from odoo import models, fields, api
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from .report_job import REPORT_CHUNK_SIZE
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -7,6 +9,7 @@ _logger = logging.getLogger(__name__)
 
 class ProjectPlannedActualReport(models.Model):
     _name = 'project.planned.actual.report'
+    _inherit = ['workload.report.job']
     _description = 'Project Planned vs Actual Report'
     _order = 'create_date desc'
 
@@ -25,7 +28,7 @@ class ProjectPlannedActualReport(models.Model):
         })
         return res
 
-    def action_generate_report(self):
+    def _generate_report(self):
         """توليد تقرير المخطط مقابل الفعلي"""
         self.ensure_one()
 
@@ -49,7 +52,12 @@ class ProjectPlannedActualReport(models.Model):
 
         projects = self.env['project.project'].search(domain)
 
-        for project in projects:
+        # الإجازات الرسمية لكل فترة التقرير في استعلام واحد
+        calendar = self.env.company.resource_calendar_id
+        holidays = self._get_public_holidays(projects, calendar)
+
+        vals_list = []
+        for done, project in enumerate(projects, 1):
             # التواريخ المخططة من البروجكت
             planned_start = project.date_start
             planned_end = project.date
@@ -69,10 +77,10 @@ class ProjectPlannedActualReport(models.Model):
                 end_variance_days = (actual_end - planned_end).days
 
             # حساب الساعات المخططة (Planned Hours)
-            planned_hours = self._calculate_working_hours(planned_start, planned_end, project)
+            planned_hours = self._calculate_working_hours(planned_start, planned_end, holidays)
 
             # حساب الساعات الفعلية (Actual Hours)
-            actual_hours = self._calculate_working_hours(actual_start, actual_end, project)
+            actual_hours = self._calculate_working_hours(actual_start, actual_end, holidays)
 
             # حساب الفرق في الساعات
             hours_variance = actual_hours - planned_hours
@@ -85,8 +93,7 @@ class ProjectPlannedActualReport(models.Model):
                 actual_end
             )
 
-            # إنشاء سطر التقرير
-            self.env['project.planned.actual.report.line'].create({
+            vals_list.append({
                 'report_id': self.id,
                 'project_id': project.id,
                 'planned_start_date': planned_start,
@@ -101,51 +108,65 @@ class ProjectPlannedActualReport(models.Model):
                 'status': status,
             })
 
-        return True
-
-    def _calculate_working_hours(self, start_date, end_date, project):
-        """حساب الساعات = (عدد أيام العمل - الإجازات) × 8 ساعات"""
-        if not start_date or not end_date:
-            return 0.0
+            # إنشاء سطور التقرير على دفعات مع تحديث نسبة التقدم
+            if len(vals_list) == REPORT_CHUNK_SIZE or done == len(projects):
+                self.env['project.planned.actual.report.line'].create(vals_list)
+                vals_list = []
+                self._set_progress(done, len(projects))
 
-        # الحصول على التقويم
-        calendar = self.env.company.resource_calendar_id
+        return True
 
-        # حساب أيام العمل بدون إجازات
-        working_days = 0
-        current_date = start_date
+    def _calculate_working_hours(self, start_date, end_date, holidays):
+        """حساب الساعات = (عدد أيام العمل - الإجازات) × 8 ساعات
 
-        while current_date <= end_date:
-            # تجاهل الجمعة (4) والسبت (5)
-            if current_date.weekday() not in (4, 5):
-                # التحقق من عدم وجود إجازة رسمية
-                if not self._is_public_holiday(current_date, calendar):
-                    working_days += 1
+        ``holidays`` is the sorted list of public holiday dates falling on
+        working days, as returned by ``_get_public_holidays``.
+        """
+        if not start_date or not end_date or start_date > end_date:
+            return 0.0
 
-            current_date += timedelta(days=1)
+        working_days = self.env['project.project']._count_working_days(start_date, end_date)
+        working_days -= bisect_right(holidays, end_date) - bisect_left(holidays, start_date)
 
         # ضرب عدد الأيام في 8 ساعات
-        total_hours = working_days * 8
-
-        _logger.info("Date Range: %s to %s - Working Days: %s - Total Hours: %s",
-                     start_date, end_date, working_days, total_hours)
+        return working_days * 8
 
-        return total_hours
+    def _get_public_holidays(self, projects, calendar):
+        """Sorted public holiday dates covering every project range of the report.
 
-    def _is_public_holiday(self, check_date, calendar):
-        """التحقق من وجود إجازة رسمية في التاريخ المحدد"""
+        Only days that would otherwise be working days are kept, so that a
+        holiday on a weekend is not deducted twice.
+        """
         if not calendar:
-            return False
-
-        # البحث عن إجازات عامة في هذا التاريخ
-        public_leaves = self.env['resource.calendar.leaves'].search([
+            return []
+
+        dates = [
+            day
+            for project in projects
+            for day in (project.date_start, project.date,
+                        getattr(project, 'start_project_date', None), getattr(project, 'end_project_date', None))
+            if day
+        ]
+        if not dates:
+            return []
+        window_start, window_end = min(dates), max(dates)
+
+        public_leaves = self.env['resource.calendar.leaves'].search_read([
             ('calendar_id', '=', calendar.id),
             ('resource_id', '=', False),  # إجازة عامة وليست خاصة بموظف
-            ('date_from', '<=', datetime.combine(check_date, datetime.max.time())),
-            ('date_to', '>=', datetime.combine(check_date, datetime.min.time())),
-        ])
-
-        return bool(public_leaves)
+            ('date_from', '<=', datetime.combine(window_end, time.max)),
+            ('date_to', '>=', datetime.combine(window_start, time.min)),
+        ], ['date_from', 'date_to'])
+
+        holidays = set()
+        for leave in public_leaves:
+            day = max(leave['date_from'].date(), window_start)
+            last_day = min(leave['date_to'].date(), window_end)
+            while day <= last_day:
+                if day.weekday() not in (4, 5):
+                    holidays.add(day)
+                day += timedelta(days=1)
+        return sorted(holidays)
 
     def _determine_status(self, start_var, end_var, planned_end, actual_end):
         """تحديد حالة المشروع"""
@@ -1,9 +1,14 @@
 from odoo import models, fields, api, _
+from odoo.tools import split_every
 from datetime import timedelta
 import logging
 
 _logger = logging.getLogger(__name__)
 
+FREE_SUPPORT_REMINDER_DAYS = 7
+SCHEDULE_FIELDS = ['planned_duration', 'days_passed', 'expected_progress', 'schedule_status']
+SCHEDULE_REFRESH_BATCH = 1000
+
 class ProjectStage(models.Model):
     _inherit = 'project.project.stage'
 
@@ -20,6 +25,67 @@ class Project(models.Model):
         help='The date when the project entered a stage that stops workload counting.'
     )
 
+    # مؤشرات الجدول الزمني: مخزنة ويتم تحديثها ليلاً لأن days_passed تعتمد على تاريخ اليوم
+    planned_duration = fields.Integer(
+        string='Planned Duration (Days)', compute='_compute_schedule_metrics', store=True)
+    days_passed = fields.Integer(
+        string='Working Days Passed', compute='_compute_schedule_metrics', store=True, index=True)
+    expected_progress = fields.Float(
+        string='Expected Progress %', digits=(10, 1), compute='_compute_schedule_metrics', store=True, index=True)
+    schedule_status = fields.Selection([
+        ('on_track', 'On Track'),
+        ('at_risk', 'At Risk'),
+        ('delayed', 'Delayed')
+    ], string='Schedule Status', compute='_compute_schedule_metrics', store=True, index=True)
+
+    @api.depends('date_start', 'date', 'date_stop_workload', 'all_delay_days',
+                 'threshold_at_risk', 'threshold_delayed')
+    def _compute_schedule_metrics(self):
+        today = fields.Date.today()
+        for project in self:
+            planned_duration = self._count_working_days(project.date_start, project.date)
+            days_passed = self._count_working_days(project.date_start, project.date_stop_workload or today)
+            project.planned_duration = planned_duration
+            project.days_passed = days_passed
+            project.expected_progress = min(days_passed / planned_duration * 100, 100.0) if planned_duration > 0 else 0
+            project.schedule_status = project._classify_schedule_status(project.all_delay_days)
+
+    def _classify_schedule_status(self, delay_days):
+        """On Track below the At Risk threshold, At Risk below the Delayed threshold, else Delayed."""
+        self.ensure_one()
+        if delay_days < self.threshold_at_risk:
+            return 'on_track'
+        if delay_days < self.threshold_delayed:
+            return 'at_risk'
+        return 'delayed'
+
+    @api.model
+    def _count_working_days(self, start_date, end_date):
+        """Working days between two dates, Friday and Saturday excluded."""
+        if not start_date or not end_date or start_date > end_date:
+            return 0
+
+        # 5 working days per full week, then the remaining days one by one
+        total_days = (end_date - start_date).days + 1
+        full_weeks, remainder = divmod(total_days, 7)
+        days = full_weeks * 5
+        for offset in range(remainder):
+            if (start_date.weekday() + offset) % 7 not in (4, 5):  # 4=Friday, 5=Saturday
+                days += 1
+        return days
+
+    def _cron_refresh_schedule_metrics(self):
+        """Nightly recompute of the schedule metrics of the running projects."""
+        projects = self.search([('date_start', '!=', False), ('date_stop_workload', '=', False)])
+        schedule_fields = [self._fields[fname] for fname in SCHEDULE_FIELDS]
+        for batch_ids in split_every(SCHEDULE_REFRESH_BATCH, projects.ids):
+            batch = self.browse(batch_ids)
+            for field in schedule_fields:
+                self.env.add_to_compute(field, batch)
+            batch.flush_recordset(SCHEDULE_FIELDS)
+            batch.invalidate_recordset()
+        _logger.info("Schedule metrics refreshed for %d project(s)", len(projects))
+
     @api.model_create_multi
     def create(self, vals_list):
         projects = super().create(vals_list)
@@ -40,30 +106,45 @@ class Project(models.Model):
     def _cron_free_support_expiry_reminder(self):
         """Send reminder to the Team Leader 7 days before Free Support ends."""
         today = fields.Date.today()
-        seven_days_later = today + timedelta(days=7)
+        seven_days_later = today + timedelta(days=FREE_SUPPORT_REMINDER_DAYS)
 
+        # Whole window instead of the exact day, so a skipped run still reminds;
+        # the ledger keeps it to one reminder per project and end date.
         projects = self.search([
-            ('free_support_end_date', '=', seven_days_later),
+            ('free_support_end_date', '>=', today),
+            ('free_support_end_date', '<=', seven_days_later),
             ('team_helpdesk_id', '!=', False),
             ('team_helpdesk_id.team_lead_id', '!=', False)
         ])
+        if not projects:
+            return
 
         activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
         if not activity_type:
             activity_type = self.env['mail.activity.type'].search([('name', '=', 'To Do')], limit=1)
 
+        Ledger = self.env['reminder.ledger']
+        already_sent = Ledger._get_sent(self._name, projects.ids, FREE_SUPPORT_REMINDER_DAYS)
+        res_model_id = self.env['ir.model']._get_id('project.project')
+        sent_keys = []
+        activity_vals_list = []
         for project in projects:
             team_lead = project.team_helpdesk_id.team_lead_id
-            try:
-                self.env['mail.activity'].create({
-                    'res_id': project.id,
-                    'res_model_id': self.env['ir.model']._get_id('project.project'),
-                    'activity_type_id': activity_type.id if activity_type else False,
-                    'summary': _('Free Support ending in 7 days'),
-                    'note': _('The Free Support for project "%s" is ending on %s. Please take necessary actions.') % (project.name, project.free_support_end_date),
-                    'date_deadline': today,
-                    'user_id': team_lead.id,
-                })
-                _logger.info("Activity created for Team Leader %s on project %s", team_lead.name, project.name)
-            except Exception as e:
-                _logger.error("Failed to create activity for %s on project %s: %s", team_lead.name, project.name, str(e))
+            key = (project.id, 'free_support_end_date', project.free_support_end_date, team_lead.partner_id.id)
+            if key in already_sent:
+                continue
+            sent_keys.append(key)
+            activity_vals_list.append({
+                'res_id': project.id,
+                'res_model_id': res_model_id,
+                'activity_type_id': activity_type.id if activity_type else False,
+                'summary': _('Free Support ending in 7 days'),
+                'note': _('The Free Support for project "%s" is ending on %s. Please take necessary actions.') % (project.name, project.free_support_end_date),
+                'date_deadline': today,
+                'user_id': team_lead.id,
+            })
+
+        if activity_vals_list:
+            Ledger._log_sent(self._name, FREE_SUPPORT_REMINDER_DAYS, sent_keys)
+            self.env['mail.activity'].create(activity_vals_list)
+            _logger.info("Free Support reminders created for %d project(s)", len(activity_vals_list))
@@ -0,0 +1,179 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from contextlib import contextmanager
+from datetime import timedelta
+import heapq
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# عدد المشاريع/الموظفين في كل دفعة قبل الـ commit
+REPORT_CHUNK_SIZE = 200
+# تقرير بحالة running لم يتحرك خلال هذه المدة يعتبر متوقف (worker قُتل)
+REPORT_JOB_TIMEOUT = timedelta(hours=1)
+# عدد أبطأ الاستعلامات التي تُسجل في وضع الـ debug
+SLOW_QUERY_LOG_SIZE = 10
+
+
+class WorkloadReportJob(models.AbstractModel):
+    """Background generation of the workload reports.
+
+    ``action_generate_report`` only queues the report and triggers the cron;
+    the cron calls ``_generate_report()`` of the inheriting model, which
+    builds the lines and reports its progress with ``_set_progress`` after
+    each chunk. Every progress update is committed so the form can show it
+    while the job runs; models without ``_generate_report`` are skipped.
+
+    ``_generate_report`` runs as the user who queued the report and in the
+    company they queued it from, so record rules and the default calendar
+    are theirs. If it raises, the job is marked failed and
+    ``_clear_partial_results`` removes the lines already committed.
+    """
+    _name = 'workload.report.job'
+    _description = 'Workload Report Job'
+
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='State', default='draft', required=True, readonly=True, copy=False)
+    progress = fields.Float(string='Progress', readonly=True, copy=False)
+    job_error = fields.Text(string='Error', readonly=True, copy=False)
+    # التقرير يُبنى بصلاحيات وشركة من طلبه وليس مستخدم الـ cron
+    job_user_id = fields.Many2one('res.users', string='Requested By', readonly=True, copy=False)
+    job_company_id = fields.Many2one('res.company', string='Requested In Company', readonly=True, copy=False)
+
+    # تكلفة آخر توليد للتقرير
+    query_count = fields.Integer(string='SQL Queries', readonly=True, copy=False)
+    sql_time = fields.Float(string='SQL Time (s)', digits=(10, 3), readonly=True, copy=False)
+    python_time = fields.Float(string='Python Time (s)', digits=(10, 3), readonly=True, copy=False)
+    rows_read = fields.Integer(string='Rows Read', readonly=True, copy=False,
+                               help="Rows returned by the SELECT queries of the generation.")
+    lines_created = fields.Integer(string='Lines Created', readonly=True, copy=False)
+
+    def _clear_partial_results(self):
+        """Remove what a failed generation already committed."""
+        self.line_ids.unlink()
+
+    def action_generate_report(self):
+        self.ensure_one()
+        if self.state in ('queued', 'running'):
+            raise UserError(_("This report is already being generated."))
+        self.write({
+            'state': 'queued',
+            'progress': 0,
+            'job_error': False,
+            'job_user_id': self.env.user.id,
+            'job_company_id': self.env.company.id,
+        })
+        self.env.ref('iet_employee_workload_reports.ir_cron_generate_workload_reports')._trigger()
+        return True
+
+    @api.model
+    def _cron_generate_reports(self):
+        stalled_before = fields.Datetime.now() - REPORT_JOB_TIMEOUT
+        for model_name in self.env.registry.descendants([self._name], '_inherit'):
+            Model = self.env[model_name]
+            if Model._abstract or not hasattr(Model, '_generate_report'):
+                continue
+            stalled = Model.search([('state', '=', 'running'), ('write_date', '<', stalled_before)])
+            if stalled:
+                _logger.warning("Requeue stalled %s reports %s", model_name, stalled.ids)
+                stalled.write({'state': 'queued'})
+            for report in Model.search([('state', '=', 'queued')]):
+                report._run_generation()
+
+    def _run_generation(self):
+        self.ensure_one()
+        # قفل التقرير حتى لا يشتغل عليه cron آخر بالتوازي
+        self.env.cr.execute(
+            f"SELECT id FROM {self._table} WHERE id = %s AND state = 'queued' FOR UPDATE SKIP LOCKED",
+            [self.id],
+        )
+        if not self.env.cr.fetchone():
+            return
+        self.write({'state': 'running', 'progress': 0})
+        self._commit_progress()
+        stats = {}
+        started = time.time()
+        report = self.with_user(self.job_user_id or self.env.user).with_company(
+            self.job_company_id or self.env.company)
+        try:
+            with self._track_queries(stats):
+                report._generate_report()
+        except Exception as e:
+            _logger.exception("Generation of %s %s failed", self._name, self.id)
+            self._rollback_progress()
+            self._clear_partial_results()
+            self.write({'state': 'failed', 'progress': 0, 'job_error': str(e)})
+        else:
+            total_time = time.time() - started
+            self.write({
+                'state': 'done',
+                'progress': 100,
+                'query_count': stats['query_count'],
+                'sql_time': stats['sql_time'],
+                'python_time': max(total_time - stats['sql_time'], 0),
+                'rows_read': stats['rows_read'],
+                'lines_created': stats['lines_created'],
+            })
+            _logger.info("Generated %s %s in %.2fs: %d queries (%.2fs SQL), %d rows read, %d lines created",
+                         self._name, self.id, total_time, stats['query_count'], stats['sql_time'],
+                         stats['rows_read'], stats['lines_created'])
+        self._commit_progress()
+
+    @contextmanager
+    def _track_queries(self, stats):
+        """Collect query count, SQL time, rows read and lines created into ``stats``.
+
+        Uses the cursor query hooks of the current thread. With DEBUG logging
+        enabled for this module, the slowest queries are logged at the end.
+        """
+        line_table = self.env[self._fields['line_ids'].comodel_name]._table
+        line_insert = f'INSERT INTO "{line_table}"'
+        debug = _logger.isEnabledFor(logging.DEBUG)
+        slowest = []
+        stats.update(query_count=0, sql_time=0.0, rows_read=0, lines_created=0)
+
+        def hook(cr, query, params, start, delay):
+            stats['query_count'] += 1
+            stats['sql_time'] += delay
+            if cr.description is not None and not query.startswith(('INSERT', 'UPDATE', 'DELETE')):
+                stats['rows_read'] += max(cr.rowcount, 0)
+            if query.startswith(line_insert):
+                stats['lines_created'] += max(cr.rowcount, 0)
+            if debug:
+                entry = (delay, stats['query_count'], query)
+                if len(slowest) < SLOW_QUERY_LOG_SIZE:
+                    heapq.heappush(slowest, entry)
+                else:
+                    heapq.heappushpop(slowest, entry)
+
+        thread = threading.current_thread()
+        previous_hooks = getattr(thread, 'query_hooks', ())
+        thread.query_hooks = (*previous_hooks, hook)
+        try:
+            yield stats
+        finally:
+            thread.query_hooks = previous_hooks
+            for delay, _index, query in sorted(slowest, reverse=True):
+                _logger.debug("Slow query of %s %s (%.3fs): %s", self._name, self.id, delay, query)
+
+    def _set_progress(self, done, total):
+        self.progress = (done / total * 100) if total else 100
+        self._commit_progress()
+
+    def _commit_progress(self):
+        # لا commit داخل الاختبارات
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+
+    def _rollback_progress(self):
+        # لا rollback داخل الاختبارات: يلغي بيانات الاختبار نفسه
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.rollback()
+        self.env.invalidate_all()
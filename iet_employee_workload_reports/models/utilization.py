@@ -0,0 +1,127 @@
+from odoo import models, fields, api
+from odoo.tools import split_every
+from odoo.tools.misc import get_lang
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+from .report_job import REPORT_CHUNK_SIZE
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class EmployeeUtilizationReport(models.Model):
+    """تقرير نسبة الاستغلال للموظفين على فترات (أسبوع / شهر)"""
+    _name = 'employee.utilization.report'
+    _inherit = ['workload.report.job']
+    _description = 'Employee Utilization Report'
+    _order = 'date_from desc'
+
+    name = fields.Char(string='Report Name', required=True)
+    date_from = fields.Date(string='From Date', required=True)
+    date_to = fields.Date(string='To Date', required=True)
+    period = fields.Selection([
+        ('week', 'Weekly'),
+        ('month', 'Monthly'),
+    ], string='Period', default='month', required=True)
+    department_id = fields.Many2one('hr.department', string='Department')
+    line_ids = fields.One2many('employee.utilization.report.line', 'report_id', string='Utilization Lines')
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super(EmployeeUtilizationReport, self).default_get(fields_list)
+        today = fields.Date.today()
+        res.update({
+            'date_from': today.replace(month=1, day=1),
+            'date_to': today.replace(month=12, day=31),
+            'name': 'Utilization Report - ' + today.strftime('%Y')
+        })
+        return res
+
+    def _generate_report(self):
+        """One grouped timesheet query and one capacity matrix for all buckets."""
+        self.ensure_one()
+        self.line_ids.unlink()
+
+        domain = [
+            ('employee_id.active', '=', True),
+            ('project_id', '!=', False),
+            ('date', '>=', self.date_from),
+            ('date', '<=', self.date_to),
+        ]
+        if self.department_id:
+            domain.append(('employee_id.department_id', '=', self.department_id.id))
+
+        ts_data = self.env['account.analytic.line']._read_group(
+            domain, ['employee_id', f'date:{self.period}'], ['unit_amount:sum'],
+        )
+        if not ts_data:
+            return True
+
+        hours = {(employee.id, bucket): assigned_hours for employee, bucket, assigned_hours in ts_data}
+        employees = self.env['hr.employee'].browse(sorted({employee.id for employee, _bucket, _hours in ts_data}))
+        bucket_starts = self._get_bucket_starts()
+
+        CapacityEngine = self.env['employee.capacity.engine']
+        capacity = CapacityEngine._get_capacity_by_bucket(employees, self.date_from, self.date_to, bucket_starts)
+
+        # سطر لكل (موظف، فترة) حتى الفترات بدون ساعات
+        vals_list = []
+        for row, employee_id in enumerate(employees.ids):
+            for column, bucket in enumerate(bucket_starts):
+                capacity_hours = float(capacity[row, column])
+                assigned_hours = hours.get((employee_id, bucket), 0.0)
+                utilization = (assigned_hours / capacity_hours * 100) if capacity_hours > 0 else 0
+                vals_list.append({
+                    'report_id': self.id,
+                    'employee_id': employee_id,
+                    'date': bucket,
+                    'capacity_hours': capacity_hours,
+                    'assigned_hours': assigned_hours,
+                    'utilization': utilization,
+                    'status': CapacityEngine._get_load_status(utilization),
+                })
+
+        done = 0
+        for chunk in split_every(REPORT_CHUNK_SIZE, vals_list, list):
+            self.env['employee.utilization.report.line'].create(chunk)
+            done += len(chunk)
+            self._set_progress(done, len(vals_list))
+
+        _logger.info("Utilization report %s: %d employees x %d buckets", self.id, len(employees), len(bucket_starts))
+        return True
+
+    def _get_bucket_start(self, day):
+        """First day of the bucket containing ``day``, as grouped by ``_read_group``."""
+        if self.period == 'month':
+            return day.replace(day=1)
+        # نفس بداية الأسبوع التي يستخدمها read_group حسب لغة المستخدم
+        first_weekday = int(get_lang(self.env).week_start) - 1
+        return day - timedelta(days=(day.weekday() - first_weekday) % 7)
+
+    def _get_bucket_starts(self):
+        step = relativedelta(months=1) if self.period == 'month' else relativedelta(weeks=1)
+        starts = []
+        bucket = self._get_bucket_start(self.date_from)
+        while bucket <= self.date_to:
+            starts.append(bucket)
+            bucket += step
+        return starts
+
+
+class EmployeeUtilizationReportLine(models.Model):
+    _name = 'employee.utilization.report.line'
+    _description = 'Employee Utilization Report Line'
+    _order = 'employee_id, date'
+
+    report_id = fields.Many2one('employee.utilization.report', string='Report', required=True, ondelete='cascade', index=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True)
+    date = fields.Date(string='Period Start', required=True)
+    capacity_hours = fields.Float(string='Capacity Hours', digits=(10, 2))
+    assigned_hours = fields.Float(string='Assigned Hours', digits=(10, 2))
+    utilization = fields.Float(string='Utilization %', digits=(10, 2), aggregator='avg')
+    status = fields.Selection([
+        ('under', 'Under'),
+        ('normal', 'Normal'),
+        ('overload', 'Overload'),
+    ], string='Status', required=True)
+    department_id = fields.Many2one('hr.department', related='employee_id.department_id', string='Department', store=True)
@@ -0,0 +1,161 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkloadMaterializedView(models.AbstractModel):
+    """Base of the read-only analysis models backed by a materialized view.
+
+    Inheriting models set ``_auto = False`` and define ``_query()``, returning
+    the SELECT of the view: one row per record with a unique ``id`` column
+    (the concurrent refresh relies on the unique index on it) and one column
+    per stored field, named after the field. Models without ``_query`` get
+    no view. The view is created at module install/update and refreshed
+    concurrently by the cron or the Refresh button, so pivot and graph views
+    read precomputed rows instead of regenerating report lines.
+    """
+    _name = 'workload.materialized.view'
+    _description = 'Workload Materialized View'
+
+    def _has_materialized_view(self):
+        return not self._abstract and hasattr(self, '_query')
+
+    def init(self):
+        if not self._has_materialized_view():
+            return
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = cr.fetchone()
+        if row and row[0] == 'v':
+            cr.execute(f"DROP VIEW {self._table} CASCADE")
+        elif row and row[0] == 'm':
+            cr.execute(f"DROP MATERIALIZED VIEW {self._table} CASCADE")
+        cr.execute(f"CREATE MATERIALIZED VIEW {self._table} AS ({self._query()})")
+        # REFRESH ... CONCURRENTLY يحتاج unique index
+        cr.execute(f"CREATE UNIQUE INDEX {self._table}_id_uniq ON {self._table} (id)")
+
+    def _refresh_materialized_view(self):
+        """Refresh the view without blocking readers of the current rows."""
+        # البيانات المعلقة في الـ ORM يجب أن تصل للجداول قبل التحديث
+        self.env.flush_all()
+        self.env.cr.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self._table}")
+        self.invalidate_model()
+
+    def action_refresh(self):
+        self._refresh_materialized_view()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def _cron_refresh_materialized_views(self):
+        for model_name in self.env.registry.descendants([self._name], '_inherit'):
+            Model = self.env[model_name]
+            if not Model._has_materialized_view():
+                continue
+            Model._refresh_materialized_view()
+            _logger.info("Refreshed materialized view %s", Model._table)
+
+
+class EmployeeWorkloadAnalysis(models.Model):
+    _name = 'employee.workload.analysis'
+    _inherit = 'workload.materialized.view'
+    _description = 'Employee Workload Analysis'
+    _auto = False
+    _order = 'date desc, employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    user_id = fields.Many2one('res.users', string='Project Manager', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Customer', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date = fields.Date(string='Month', readonly=True)
+    hours = fields.Float(string='Hours', digits=(10, 2), readonly=True)
+    timesheet_count = fields.Integer(string='Timesheets', readonly=True)
+
+    def _query(self):
+        # ساعات التايم شيت لكل موظف ومشروع وشهر
+        return """
+            SELECT MIN(aal.id) AS id,
+                   aal.employee_id,
+                   emp.department_id,
+                   aal.project_id,
+                   pp.user_id,
+                   pp.partner_id,
+                   aal.company_id,
+                   date_trunc('month', aal.date)::date AS date,
+                   SUM(aal.unit_amount) AS hours,
+                   COUNT(*) AS timesheet_count
+              FROM account_analytic_line aal
+              JOIN project_project pp ON pp.id = aal.project_id
+              JOIN hr_employee emp ON emp.id = aal.employee_id
+             WHERE pp.active
+          GROUP BY aal.employee_id, emp.department_id, aal.project_id, pp.user_id,
+                   pp.partner_id, aal.company_id, date_trunc('month', aal.date)
+        """
+
+
+class ProjectPlannedActualAnalysis(models.Model):
+    _name = 'project.planned.actual.analysis'
+    _inherit = 'workload.materialized.view'
+    _description = 'Project Planned vs Actual Analysis'
+    _auto = False
+    _order = 'end_variance_days desc, project_id'
+
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    user_id = fields.Many2one('res.users', string='Project Manager', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Customer', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    planned_start_date = fields.Date(string='Planned Start', readonly=True)
+    planned_end_date = fields.Date(string='Planned End', readonly=True)
+    actual_start_date = fields.Date(string='Actual Start', readonly=True)
+    actual_end_date = fields.Date(string='Actual End', readonly=True)
+    start_variance_days = fields.Integer(string='Start Variance (Days)', readonly=True)
+    end_variance_days = fields.Integer(string='End Variance (Days)', readonly=True)
+
+    completion_percent = fields.Float(string='Completion %', readonly=True, aggregator='avg')
+    delay_days = fields.Float(string='Delay (Days)', digits=(10, 1), readonly=True)
+    task_count = fields.Integer(string='Plan Tasks', readonly=True)
+    done_task_count = fields.Integer(string='Done Tasks', readonly=True)
+    late_task_count = fields.Integer(string='Late Tasks', readonly=True)
+    actual_hours = fields.Float(string='Actual Hours', digits=(10, 2), readonly=True)
+
+    def _query(self):
+        # سطر لكل مشروع: التواريخ من البروجكت، المهام من الخطة، الساعات من التايم شيت
+        return """
+            SELECT pp.id AS id,
+                   pp.id AS project_id,
+                   pp.user_id,
+                   pp.partner_id,
+                   pp.company_id,
+                   pp.date_start AS planned_start_date,
+                   pp.date AS planned_end_date,
+                   pp.start_project_date AS actual_start_date,
+                   pp.end_project_date AS actual_end_date,
+                   COALESCE(pp.start_project_date - pp.date_start, 0) AS start_variance_days,
+                   COALESCE(pp.end_project_date - pp.date, 0) AS end_variance_days,
+                   pp.completion_percent,
+                   pp.all_delay_days AS delay_days,
+                   COALESCE(plan.task_count, 0) AS task_count,
+                   COALESCE(plan.done_task_count, 0) AS done_task_count,
+                   COALESCE(plan.late_task_count, 0) AS late_task_count,
+                   COALESCE(ts.actual_hours, 0) AS actual_hours
+              FROM project_project pp
+         LEFT JOIN (
+                    SELECT project_id,
+                           COUNT(*) AS task_count,
+                           COUNT(*) FILTER (WHERE status_done) AS done_task_count,
+                           COUNT(*) FILTER (WHERE delay_days > 0) AS late_task_count
+                      FROM project_plan_line
+                     WHERE display_type IS NULL
+                  GROUP BY project_id
+                   ) plan ON plan.project_id = pp.id
+         LEFT JOIN (
+                    SELECT project_id, SUM(unit_amount) AS actual_hours
+                      FROM account_analytic_line
+                     WHERE project_id IS NOT NULL
+                  GROUP BY project_id
+                   ) ts ON ts.project_id = pp.id
+             WHERE pp.active
+        """
@@ -0,0 +1,31 @@
+import {ProgressBarField, progressBarField} from "@web/views/fields/progress_bar/progress_bar_field";
+import {registry} from "@web/core/registry";
+import {useEffect} from "@odoo/owl";
+
+// كل كام ثانية نعيد تحميل التقرير طالما التوليد شغال في الخلفية
+const POLL_INTERVAL = 2000;
+
+export class WorkloadReportProgressField extends ProgressBarField {
+    setup() {
+        super.setup();
+        useEffect(
+            (state) => {
+                if (!["queued", "running"].includes(state)) {
+                    return;
+                }
+                const interval = setInterval(() => {
+                    if (!this.props.record.dirty) {
+                        this.props.record.model.load();
+                    }
+                }, POLL_INTERVAL);
+                return () => clearInterval(interval);
+            },
+            () => [this.props.record.data.state]
+        );
+    }
+}
+
+registry.category("fields").add("workload_report_progress", {
+    ...progressBarField,
+    component: WorkloadReportProgressField,
+});
@@ -0,0 +1,9 @@
+from . import test_report_job
+from . import test_workload_report
+from . import test_planned_vs_actual
+from . import test_per_project
+from . import test_capacity_engine
+from . import test_workload_analysis
+from . import test_schedule_metrics
+from . import test_utilization
+from . import test_workload_benchmark
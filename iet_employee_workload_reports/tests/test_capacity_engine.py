@@ -0,0 +1,65 @@
+from datetime import date, datetime
+from odoo.tests.common import TransactionCase
+
+
+class TestCapacityEngine(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.engine = cls.env['employee.capacity.engine']
+        cls.calendar = cls.env.company.resource_calendar_id
+        cls.employee = cls.env['hr.employee'].create({'name': 'Capacity Employee', 'resource_calendar_id': cls.calendar.id})
+        cls.employee_no_calendar = cls.env['hr.employee'].create({'name': 'No Calendar Employee'})
+        cls.employee_no_calendar.resource_calendar_id = False
+        cls.employees = cls.employee | cls.employee_no_calendar
+
+    def test_capacity_hours(self):
+        # الجمعة والسبت ليست أيام عمل: من الإثنين للخميس × 8 ساعات
+        capacity = self.engine._get_capacity_hours(self.employees, date(2025, 1, 5), date(2025, 1, 11))
+        self.assertEqual(capacity, {self.employee.id: 32, self.employee_no_calendar.id: 32})
+
+    def test_public_holidays(self):
+        self.env['resource.calendar.leaves'].create([{
+            'name': 'Calendar Holiday',
+            'calendar_id': self.calendar.id,
+            'date_from': datetime(2025, 1, 7, 0, 0),
+            'date_to': datetime(2025, 1, 7, 23, 59),
+        }, {
+            'name': 'Company Holiday',
+            'calendar_id': False,
+            'date_from': datetime(2025, 1, 8, 0, 0),
+            'date_to': datetime(2025, 1, 8, 23, 59),
+        }, {
+            'name': 'Personal Leave',
+            'calendar_id': self.calendar.id,
+            'resource_id': self.employee.resource_id.id,
+            'date_from': datetime(2025, 1, 9, 0, 0),
+            'date_to': datetime(2025, 1, 9, 23, 59),
+        }])
+        capacity = self.engine._get_capacity_hours(self.employee, date(2025, 1, 5), date(2025, 1, 11))
+        self.assertEqual(capacity[self.employee.id], 16)
+
+    def test_capacity_by_bucket(self):
+        buckets = [date(2024, 12, 30), date(2025, 1, 6), date(2025, 1, 13)]
+        capacity = self.engine._get_capacity_by_bucket(self.employees, date(2025, 1, 5), date(2025, 1, 18), buckets)
+        self.assertEqual(capacity.shape, (2, 3))
+        self.assertEqual(capacity.tolist(), [[0, 32, 32], [0, 32, 32]])
+
+    def test_empty(self):
+        capacity = self.engine._get_capacity_matrix(self.env['hr.employee'], date(2025, 1, 5), date(2025, 1, 11))
+        self.assertEqual(capacity.shape, (0, 7))
+        self.assertEqual(self.engine._get_capacity_hours(self.env['hr.employee'], date(2025, 1, 5), date(2025, 1, 11)), {})
+
+    def test_no_calendar_at_all(self):
+        # موظف بدون تقويم في شركة بدون تقويم افتراضي: سعة صفر بدل KeyError
+        self.env.company.resource_calendar_id = False
+        capacity = self.engine._get_capacity_hours(self.employees, date(2025, 1, 5), date(2025, 1, 11))
+        self.assertEqual(capacity, {self.employee.id: 32, self.employee_no_calendar.id: 0})
+        capacity = self.engine._get_capacity_hours(self.employee_no_calendar, date(2025, 1, 5), date(2025, 1, 11))
+        self.assertEqual(capacity, {self.employee_no_calendar.id: 0})
+
+    def test_load_status(self):
+        self.assertEqual(self.engine._get_load_status(79.9), 'under')
+        self.assertEqual(self.engine._get_load_status(80), 'normal')
+        self.assertEqual(self.engine._get_load_status(100), 'overload')
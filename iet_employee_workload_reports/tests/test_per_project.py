@@ -0,0 +1,48 @@
+from datetime import date
+from odoo.tests.common import TransactionCase
+
+
+class TestPerProjectReport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        calendar = cls.env.company.resource_calendar_id
+        cls.employee = cls.env['hr.employee'].create({'name': 'Per Project Employee', 'resource_calendar_id': calendar.id})
+        cls.project_a = cls.env['project.project'].create({'name': 'Project A'})
+        cls.project_b = cls.env['project.project'].create({'name': 'Project B'})
+        # أسبوع 5-11 يناير 2025: 4 أيام عمل × 8 ساعات = 32 ساعة
+        cls.env['account.analytic.line'].create([{
+            'name': 'Work',
+            'project_id': project.id,
+            'employee_id': cls.employee.id,
+            'unit_amount': hours,
+            'date': day,
+        } for project, hours, day in [
+            (cls.project_a, 8, date(2025, 1, 6)),
+            (cls.project_a, 8, date(2025, 1, 7)),
+            (cls.project_b, 16, date(2025, 1, 8)),
+            (cls.project_b, 40, date(2025, 2, 3)),
+        ]])
+        cls.report = cls.env['employee.per.project.report'].create({
+            'name': 'Per Project',
+            'date_from': date(2025, 1, 5),
+            'date_to': date(2025, 1, 11),
+        })
+
+    def test_generate_report(self):
+        self.report._generate_report()
+        lines = self.report.line_ids.filtered(lambda line: line.employee_id == self.employee)
+        self.assertEqual(len(lines), 2)
+        for line in lines:
+            self.assertEqual(line.capacity_hours, 32)
+            self.assertEqual(line.assigned_hours, 16)
+            self.assertAlmostEqual(line.load_percentage, 50)
+            self.assertEqual(line.status, 'under')
+
+    def test_regenerate_replaces_lines(self):
+        self.report._generate_report()
+        first_lines = self.report.line_ids
+        self.report._generate_report()
+        self.assertFalse(first_lines.exists())
+        self.assertEqual(len(self.report.line_ids.filtered(lambda line: line.employee_id == self.employee)), 2)
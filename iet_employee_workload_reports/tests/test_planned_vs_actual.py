@@ -0,0 +1,19 @@
+from datetime import date
+from odoo.tests.common import TransactionCase
+
+
+class TestPlannedVsActual(TransactionCase):
+
+    def test_working_hours(self):
+        report = self.env['project.planned.actual.report']
+        # من الأحد 5 إلى السبت 18 يناير 2025: أسبوعان = 10 أيام عمل
+        start, end = date(2025, 1, 5), date(2025, 1, 18)
+        self.assertEqual(report._calculate_working_hours(start, end, []), 80)
+        self.assertEqual(report._calculate_working_hours(start, end, [date(2025, 1, 7), date(2025, 1, 20)]), 72)
+        self.assertEqual(report._calculate_working_hours(end, start, []), 0)
+
+    def test_working_days_partial_week(self):
+        Project = self.env['project.project']
+        # الخميس 9 إلى الأحد 12 يناير: الخميس والأحد فقط
+        self.assertEqual(Project._count_working_days(date(2025, 1, 9), date(2025, 1, 12)), 2)
+        self.assertEqual(Project._count_working_days(date(2025, 1, 10), date(2025, 1, 11)), 0)
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase, new_test_user
+
+
+class TestReportJob(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env['res.company'].create({'name': 'Workload Company'})
+        cls.user = new_test_user(
+            cls.env, login='workload_manager',
+            groups='project.group_project_manager',
+            company_id=cls.company.id,
+            company_ids=[(6, 0, [cls.company.id, cls.env.company.id])],
+        )
+        cls.employee = cls.env['hr.employee'].create({'name': 'Workload Employee'})
+        cls.project = cls.env['project.project'].create({'name': 'Workload Project'})
+        cls.ReportModel = type(cls.env['employee.per.project.report'])
+
+    def _queue_report(self):
+        report = self.env['employee.per.project.report'].with_user(self.user).with_company(self.company).create({
+            'name': 'Queued Report',
+            'date_from': '2025-01-01',
+            'date_to': '2025-01-31',
+        })
+        report.action_generate_report()
+        return report
+
+    def test_generation_runs_as_requesting_user_and_company(self):
+        report = self._queue_report()
+        self.assertEqual(report.state, 'queued')
+        self.assertEqual(report.job_user_id, self.user)
+        self.assertEqual(report.job_company_id, self.company)
+
+        seen = {}
+
+        def _generate_report(self):
+            seen['uid'] = self.env.uid
+            seen['company'] = self.env.company
+            return True
+
+        with patch.object(self.ReportModel, '_generate_report', _generate_report):
+            self.env['workload.report.job'].sudo()._cron_generate_reports()
+
+        self.assertEqual(report.state, 'done')
+        self.assertEqual(seen['uid'], self.user.id)
+        self.assertEqual(seen['company'], self.company)
+
+    def test_failed_generation_removes_partial_lines(self):
+        report = self._queue_report()
+        employee, project = self.employee, self.project
+
+        def _generate_report(self):
+            self.env['employee.per.project.report.line'].create({
+                'report_id': self.id,
+                'employee_id': employee.id,
+                'project_id': project.id,
+                'status': 'normal',
+            })
+            self._set_progress(1, 2)
+            raise ValueError("Broken chunk")
+
+        with patch.object(self.ReportModel, '_generate_report', _generate_report):
+            self.env['workload.report.job'].sudo()._cron_generate_reports()
+
+        self.assertEqual(report.state, 'failed')
+        self.assertIn("Broken chunk", report.job_error)
+        self.assertFalse(report.line_ids)
+
+    def test_generation_statistics(self):
+        self.env['account.analytic.line'].create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'employee_id': self.employee.id,
+            'unit_amount': 4,
+            'date': '2025-01-06',
+        })
+        report = self.env['employee.per.project.report'].create({
+            'name': 'Statistics Report',
+            'date_from': '2025-01-01',
+            'date_to': '2025-01-31',
+        })
+        report.action_generate_report()
+        self.env['workload.report.job'].sudo()._cron_generate_reports()
+
+        self.assertEqual(report.state, 'done')
+        self.assertEqual(report.progress, 100)
+        self.assertTrue(report.line_ids)
+        self.assertEqual(report.lines_created, len(report.line_ids))
+        self.assertGreater(report.query_count, 0)
+        self.assertGreater(report.rows_read, 0)
+        self.assertGreaterEqual(report.sql_time, 0)
+        self.assertGreaterEqual(report.python_time, 0)
+
+    def test_already_queued(self):
+        report = self._queue_report()
+        with self.assertRaises(UserError):
+            report.action_generate_report()
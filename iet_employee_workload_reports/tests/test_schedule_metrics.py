@@ -0,0 +1,43 @@
+from datetime import date
+from freezegun import freeze_time
+from odoo.tests.common import TransactionCase
+
+
+class TestScheduleMetrics(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # من الأحد 5 إلى السبت 18 يناير 2025: 10 أيام عمل
+        with freeze_time('2025-01-09'):
+            cls.project = cls.env['project.project'].create({
+                'name': 'Schedule Project',
+                'date_start': date(2025, 1, 5),
+                'date': date(2025, 1, 18),
+            })
+
+    def test_metrics(self):
+        self.assertEqual(self.project.planned_duration, 10)
+        self.assertEqual(self.project.days_passed, 5)
+        self.assertAlmostEqual(self.project.expected_progress, 50)
+        self.assertEqual(self.project.schedule_status, 'on_track')
+
+    def test_stopped_project(self):
+        self.project.date_stop_workload = date(2025, 1, 7)
+        self.assertEqual(self.project.days_passed, 3)
+        self.assertAlmostEqual(self.project.expected_progress, 30)
+
+    def test_cron_refresh(self):
+        with freeze_time('2025-01-16'):
+            self.env['project.project']._cron_refresh_schedule_metrics()
+        self.assertEqual(self.project.days_passed, 10)
+        self.assertAlmostEqual(self.project.expected_progress, 100)
+        with freeze_time('2025-02-20'):
+            self.env['project.project']._cron_refresh_schedule_metrics()
+        self.assertAlmostEqual(self.project.expected_progress, 100)
+
+    def test_status_thresholds(self):
+        self.project.write({'threshold_at_risk': 5, 'threshold_delayed': 8})
+        self.assertEqual(self.project._classify_schedule_status(4), 'on_track')
+        self.assertEqual(self.project._classify_schedule_status(5), 'at_risk')
+        self.assertEqual(self.project._classify_schedule_status(8), 'delayed')
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+from odoo.tests.common import TransactionCase
+
+
+class TestUtilizationReport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        calendar = cls.env.company.resource_calendar_id
+        cls.employee = cls.env['hr.employee'].create({'name': 'Utilization Employee', 'resource_calendar_id': calendar.id})
+        project = cls.env['project.project'].create({'name': 'Utilization Project'})
+        cls.env['account.analytic.line'].create([{
+            'name': 'Work',
+            'project_id': project.id,
+            'employee_id': cls.employee.id,
+            'unit_amount': 8,
+            'date': day,
+        } for day in (date(2025, 1, 6), date(2025, 1, 8))])
+
+    def _generate(self, period, date_from, date_to):
+        report = self.env['employee.utilization.report'].create({
+            'name': 'Utilization',
+            'period': period,
+            'date_from': date_from,
+            'date_to': date_to,
+        })
+        report._generate_report()
+        return report.line_ids.filtered(lambda line: line.employee_id == self.employee)
+
+    def test_monthly(self):
+        lines = self._generate('month', date(2025, 1, 1), date(2025, 2, 28))
+        self.assertEqual(lines.mapped('date'), [date(2025, 1, 1), date(2025, 2, 1)])
+        # يناير 2025: 18 يوم عمل، فبراير: 16 (من الإثنين للخميس)
+        self.assertEqual(lines.mapped('capacity_hours'), [144, 128])
+        self.assertEqual(lines.mapped('assigned_hours'), [16, 0])
+        self.assertAlmostEqual(lines[0].utilization, 100 / 9, places=2)
+        self.assertEqual(lines[1].utilization, 0)
+
+    def test_weekly_buckets_match_timesheet_groups(self):
+        lines = self._generate('week', date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(sum(lines.mapped('assigned_hours')), 16)
+        worked = lines.filtered('assigned_hours')
+        for line in worked:
+            self.assertTrue(line.date <= date(2025, 1, 8) < line.date + timedelta(days=7))
+        dates = lines.mapped('date')
+        self.assertEqual(dates, sorted(dates))
+        self.assertTrue(all(later - earlier == timedelta(days=7) for earlier, later in zip(dates, dates[1:])))
@@ -0,0 +1,44 @@
+from datetime import date
+from odoo.tests.common import TransactionCase
+
+
+class TestWorkloadAnalysis(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employee = cls.env['hr.employee'].create({'name': 'Analysis Employee'})
+        cls.project = cls.env['project.project'].create({'name': 'Analysis Project'})
+        cls.env['account.analytic.line'].create([{
+            'name': 'Work',
+            'project_id': cls.project.id,
+            'employee_id': cls.employee.id,
+            'unit_amount': hours,
+            'date': day,
+        } for hours, day in [(3, date(2025, 1, 6)), (5, date(2025, 1, 20)), (2, date(2025, 2, 3))]])
+        cls.env['project.plan.line'].create([
+            {'name': 'Phase', 'project_id': cls.project.id, 'display_type': 'line_section'},
+            {'name': 'Task 1', 'project_id': cls.project.id, 'status_done': True},
+            {'name': 'Task 2', 'project_id': cls.project.id},
+        ])
+
+    def test_refresh_workload_analysis(self):
+        Analysis = self.env['employee.workload.analysis']
+        Analysis._refresh_materialized_view()
+        rows = Analysis.search([('employee_id', '=', self.employee.id)], order='date')
+        self.assertEqual(rows.mapped('date'), [date(2025, 1, 1), date(2025, 2, 1)])
+        self.assertEqual(rows.mapped('hours'), [8, 2])
+        self.assertEqual(rows.mapped('timesheet_count'), [2, 1])
+
+    def test_refresh_planned_actual_analysis(self):
+        Analysis = self.env['project.planned.actual.analysis']
+        Analysis._refresh_materialized_view()
+        row = Analysis.search([('project_id', '=', self.project.id)])
+        self.assertEqual(row.task_count, 2)
+        self.assertEqual(row.done_task_count, 1)
+        self.assertEqual(row.actual_hours, 10)
+
+    def test_cron_refreshes_every_view(self):
+        self.env['workload.materialized.view']._cron_refresh_materialized_views()
+        self.assertTrue(self.env['employee.workload.analysis'].search([('employee_id', '=', self.employee.id)]))
+        self.assertTrue(self.env['project.planned.actual.analysis'].search([('project_id', '=', self.project.id)]))
@@ -0,0 +1,77 @@
+from datetime import date
+import logging
+import time
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class TestWorkloadBenchmark(TransactionCase):
+    """Query count and wall time of the grouped generation against the old per-project loop."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employees = cls.env['hr.employee'].create([{'name': f'Benchmark Employee {index}'} for index in range(3)])
+
+    def _create_projects(self, count):
+        projects = self.env['project.project'].create([{'name': f'Benchmark Project {index}'} for index in range(count)])
+        self.env['account.analytic.line'].create([{
+            'name': 'Work',
+            'project_id': project.id,
+            'employee_id': employee.id,
+            'unit_amount': 2,
+            'date': date(2025, 1, day),
+        } for project in projects for employee in self.employees for day in (6, 7)])
+        return projects
+
+    def _old_generate(self, report):
+        # الطريقة القديمة: استعلام وسطر لكل مشروع ولكل موظف
+        Line = self.env['employee.workload.report.line']
+        for project in report.project_ids:
+            Line.create({
+                'report_id': report.id,
+                'project_id': project.id,
+                'is_project_line': True,
+                'status': 'normal',
+                **report._calculate_project_metrics(project),
+            })
+            ts_data = self.env['account.analytic.line'].read_group(
+                [('project_id', '=', project.id), ('employee_id', '!=', False)],
+                ['unit_amount'], ['employee_id'])
+            for data in ts_data:
+                Line.create({
+                    'report_id': report.id,
+                    'project_id': project.id,
+                    'employee_id': data['employee_id'][0],
+                    'assigned_hours': data['unit_amount'],
+                    'is_project_line': False,
+                    'status': 'normal',
+                })
+
+    def _measure(self, projects, generate):
+        report = self.env['employee.workload.report'].create({
+            'name': 'Benchmark',
+            'project_ids': [(6, 0, projects.ids)],
+        })
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.cr.sql_log_count
+        started = time.perf_counter()
+        generate(report)
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        self.assertEqual(len(report.line_ids), len(projects) * (len(self.employees) + 1))
+        return self.cr.sql_log_count - queries, elapsed
+
+    def test_grouped_generation_queries(self):
+        small = self._create_projects(10)
+        large = self._create_projects(40)
+        new_small, _time = self._measure(small, lambda report: report._generate_report())
+        new_large, new_time = self._measure(large, lambda report: report._generate_report())
+        old_large, old_time = self._measure(large, self._old_generate)
+        _logger.info("Workload report, %d projects: %d queries in %.3fs (per-project loop: %d queries in %.3fs)",
+                     len(large), new_large, new_time, old_large, old_time)
+        # عدد الاستعلامات لا يزيد مع عدد المشاريع
+        self.assertLessEqual(new_large - new_small, 5)
+        self.assertLess(new_large * 4, old_large)
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+from odoo.tests.common import TransactionCase
+from odoo.addons.iet_employee_workload_reports.models.employee_workload_report import SOURCE_WATERMARK_MARGIN
+
+
+class TestWorkloadReport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.calendar = cls.env.company.resource_calendar_id
+        cls.employee = cls.env['hr.employee'].create({
+            'name': 'Workload Employee',
+            'resource_calendar_id': cls.calendar.id,
+        })
+        cls.project = cls.env['project.project'].create({'name': 'Workload Project'})
+        # من الأحد 5 إلى الخميس 9 يناير 2025: 4 أيام عمل (الإثنين - الخميس)
+        cls.timesheet = cls.env['account.analytic.line'].create({
+            'name': 'Work',
+            'project_id': cls.project.id,
+            'employee_id': cls.employee.id,
+            'unit_amount': 8,
+            'date': date(2025, 1, 6),
+        })
+        cls.report = cls.env['employee.workload.report'].create({
+            'name': 'Workload',
+            'project_ids': [(6, 0, cls.project.ids)],
+            'date_from': date(2025, 1, 5),
+            'date_to': date(2025, 1, 9),
+        })
+
+    def _employee_line(self):
+        return self.report.line_ids.filtered(lambda line: line.employee_id == self.employee)
+
+    def test_generate_report(self):
+        self.report._generate_report()
+        line = self._employee_line()
+        self.assertEqual(line.assigned_hours, 8)
+        self.assertAlmostEqual(line.load_percentage, 25, places=2)
+        self.assertEqual(line.status, 'under')
+        project_line = self.report.line_ids.filtered('is_project_line')
+        self.assertEqual(project_line.timesheet_count, 1)
+
+    def test_refresh_after_time_off(self):
+        self.report._generate_report()
+        line = self._employee_line()
+        self.assertAlmostEqual(line.load_percentage, 25, places=2)
+
+        # عطلة رسمية يوم الثلاثاء: لا يتغير أي تايم شيت لكن السعة تقل إلى 24 ساعة
+        self.env['resource.calendar.leaves'].create({
+            'name': 'Holiday',
+            'calendar_id': self.calendar.id,
+            'date_from': datetime(2025, 1, 7, 0, 0),
+            'date_to': datetime(2025, 1, 7, 23, 59),
+        })
+        self.report._generate_report()
+        self.assertEqual(self._employee_line(), line)
+        self.assertAlmostEqual(line.load_percentage, 100 / 3, places=2)
+
+    def test_refresh_after_deleted_timesheet(self):
+        self.report._generate_report()
+        self.assertTrue(self._employee_line())
+        self.timesheet.unlink()
+        self.report._generate_report()
+        self.assertFalse(self._employee_line())
+
+    def test_lines_per_project_and_employee(self):
+        other_employee = self.env['hr.employee'].create({
+            'name': 'Other Employee',
+            'resource_calendar_id': self.calendar.id,
+        })
+        other_project = self.env['project.project'].create({'name': 'Other Workload Project'})
+        outside_project = self.env['project.project'].create({'name': 'Outside Project'})
+        Timesheet = self.env['account.analytic.line']
+        Timesheet.create([{
+            'name': 'Work',
+            'project_id': project.id,
+            'employee_id': employee.id,
+            'unit_amount': hours,
+            'date': date(2025, 1, 7),
+        } for project, employee, hours in [
+            (self.project, self.employee, 4),
+            (self.project, other_employee, 2),
+            (other_project, self.employee, 6),
+            (outside_project, self.employee, 5),
+        ]])
+        self.report.project_ids = self.project | other_project
+        self.report._generate_report()
+
+        lines = self.report.line_ids.filtered(lambda line: not line.is_project_line)
+        hours = {(line.project_id, line.employee_id): line.assigned_hours for line in lines}
+        self.assertEqual(hours, {
+            (self.project, self.employee): 12,
+            (self.project, other_employee): 2,
+            (other_project, self.employee): 6,
+        })
+        self.assertEqual(self.report.line_ids.filtered('is_project_line').project_id, self.project | other_project)
+
+        self.report.employee_id = other_employee
+        self.report._generate_report()
+        lines = self.report.line_ids.filtered(lambda line: not line.is_project_line)
+        self.assertEqual(lines.employee_id, other_employee)
+
+    def test_stale_projects_follow_timesheets_only(self):
+        self.report._generate_report()
+        self.assertEqual(self.report.source_write_date, self.env.cr.now() - SOURCE_WATERMARK_MARGIN)
+        # تايم شيت قديم وتوليد سابق قبل ساعة
+        self.env.cr.execute("UPDATE account_analytic_line SET write_date = %s WHERE id = %s",
+                            [self.env.cr.now() - timedelta(hours=2), self.timesheet.id])
+        self.timesheet.invalidate_recordset(['write_date'])
+        self.report.source_write_date = self.env.cr.now() - timedelta(hours=1)
+        timesheet_domain = [('project_id', 'in', self.project.ids), ('employee_id', '!=', False),
+                            ('date', '>=', self.report.date_from), ('date', '<=', self.report.date_to)]
+
+        # تحديث مؤشرات الجدول الزمني الليلي يغيّر write_date المشروع فقط
+        self.env['project.project']._cron_refresh_schedule_metrics()
+        self.project.write({'threshold_at_risk': 3})
+        self.assertFalse(self.report._get_stale_projects(self.project, timesheet_domain))
+
+        self.timesheet.unit_amount = 6
+        self.assertEqual(self.report._get_stale_projects(self.project, timesheet_domain), self.project)
@@ -1,17 +1,18 @@
 {
     'name': 'Project Payment Tracking',
-    'version': '1.0',
+    'version': '1.1',
     'category': 'Project',
     "website": "https://intelligent-experts.com/en/home/",
     'auther': 'IET - SalehElSrief',
     'summary': 'Track payment dates for projects with notifications',
-    'depends': ['project', 'mail'],
+    'depends': ['project', 'mail', 'iet_reminder_ledger'],
     'data': [
         'security/groups.xml',
         'security/ir.model.access.csv',
         'views/project_payment_views.xml',
         'views/project_views.xml',
         'views/payment_wizard_views.xml',
+        'views/payment_forecast_views.xml',
         'data/ir_cron_data.xml',
     ],
     'installable': True,
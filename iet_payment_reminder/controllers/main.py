@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+from ..models.payment_forecast import FORECAST_PERIODS
+
+
+class PaymentForecastController(http.Controller):
+
+    @http.route('/payment_reminder/forecast', type='json', auth='user')
+    def payment_forecast(self, period='month', date_from=None, date_to=None, groupby=None, **kw):
+        """Receivables forecast from the precomputed table, plus the 30/60/90 days horizons."""
+        if period not in dict(FORECAST_PERIODS):
+            period = 'month'
+        Forecast = request.env['project.payment.forecast']
+        request.env['project.payment.milestone'].check_access('read')
+        return Forecast.get_forecast_data(period, date_from, date_to, groupby)
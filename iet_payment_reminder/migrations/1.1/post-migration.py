@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Move the fixed contract/UAT/live/installment columns of project.payment
+into project.payment.milestone rows.
+
+The old columns are left in the table by the ORM, so they are read with SQL.
+"""
+
+# (type, sequence, planned column, actual column, done column, done date column,
+#  notified column, snoozed until column, snooze count column)
+MILESTONE_COLUMNS = [
+    ('contract', 1, 'contract_payment_date', 'actual_contract_payment_date', 'contract_done',
+     'contract_done_date', 'contract_notification_sent', 'contract_snoozed_until', 'contract_snooze_count'),
+    ('uat', 2, 'uat_due_payment', 'actual_uat_due_payment', 'uat_done',
+     'uat_done_date', 'uat_notification_sent', 'uat_snoozed_until', 'uat_snooze_count'),
+    ('live', 3, 'live_due_payment', 'actual_live_due_payment', 'live_done',
+     'live_done_date', 'live_notification_sent', 'live_snoozed_until', 'live_snooze_count'),
+]
+INSTALLMENT_COLUMNS = [
+    (3 + index, f'installment_date_{index}', f'actual_installment_date_{index}') for index in range(1, 5)
+]
+
+
+def _column_exists(cr, table, column):
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = %s AND column_name = %s
+    """, (table, column))
+    return bool(cr.fetchone())
+
+
+def migrate(cr, version):
+    if not version or not _column_exists(cr, 'project_payment', 'contract_payment_date'):
+        return
+
+    for (milestone_type, sequence, planned, actual, done, done_date,
+         notified, snoozed_until, snooze_count) in MILESTONE_COLUMNS:
+        cr.execute(f"""
+            INSERT INTO project_payment_milestone (
+                payment_id, project_id, customer_id, milestone_type, sequence,
+                planned_date, actual_date, state, snoozed_until, snooze_count, done_date,
+                create_uid, create_date, write_uid, write_date)
+            SELECT id, project_id, customer_id, %s, %s,
+                   {planned}, {actual},
+                   CASE WHEN {done} THEN 'done'
+                        WHEN {snoozed_until} IS NOT NULL THEN 'snoozed'
+                        WHEN {notified} THEN 'notified'
+                        ELSE 'pending' END,
+                   {snoozed_until}, COALESCE({snooze_count}, 0), {done_date},
+                   create_uid, create_date, write_uid, write_date
+              FROM project_payment
+             WHERE {planned} IS NOT NULL OR {actual} IS NOT NULL
+        """, (milestone_type, sequence))
+
+    # الأقساط لم يكن لها تذكير: الماضي منها يعتبر تم التنبيه عليه حتى لا يرسل دفعة واحدة
+    for sequence, planned, actual in INSTALLMENT_COLUMNS:
+        cr.execute(f"""
+            INSERT INTO project_payment_milestone (
+                payment_id, project_id, customer_id, milestone_type, sequence,
+                planned_date, actual_date, state, snooze_count,
+                create_uid, create_date, write_uid, write_date)
+            SELECT id, project_id, customer_id, 'installment', %s,
+                   {planned}, {actual},
+                   CASE WHEN {actual} IS NOT NULL THEN 'done'
+                        WHEN {planned} < CURRENT_DATE THEN 'notified'
+                        ELSE 'pending' END,
+                   0, create_uid, create_date, write_uid, write_date
+              FROM project_payment
+             WHERE has_installments AND ({planned} IS NOT NULL OR {actual} IS NOT NULL)
+        """, (sequence,))
+
+    cr.execute("UPDATE project_payment SET state = 'snoozed' WHERE state LIKE 'snoozed%'")
+
+    # Keep the sent reminders: they now point at the milestone instead of the payment
+    cr.execute("""
+        UPDATE reminder_ledger ledger
+           SET res_model = 'project.payment.milestone',
+               res_id = milestone.id,
+               date_field = 'planned_date'
+          FROM project_payment_milestone milestone,
+               (VALUES ('contract_payment_date', 'contract'),
+                       ('uat_due_payment', 'uat'),
+                       ('live_due_payment', 'live')) AS mapping (date_field, milestone_type)
+         WHERE ledger.res_model = 'project.payment'
+           AND ledger.date_field = mapping.date_field
+           AND milestone.payment_id = ledger.res_id
+           AND milestone.milestone_type = mapping.milestone_type
+    """)
@@ -1,3 +1,5 @@
 from . import project_payment
+from . import payment_milestone
 from . import project
-from . import payment_wizard
\ No newline at end of file
+from . import payment_wizard
+from . import payment_forecast
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from datetime import timedelta
+from .payment_milestone import MILESTONE_TYPES
+import logging
+
+_logger = logging.getLogger(__name__)
+
+FORECAST_PERIODS = [
+    ('week', 'Week'),
+    ('month', 'Month'),
+]
+FORECAST_HORIZONS = (30, 60, 90)
+
+
+class ProjectPaymentForecast(models.Model):
+    """Receivables forecast: milestones counted per period, customer, project manager and type.
+
+    The table is rebuilt by a daily cron with a single INSERT ... SELECT, so
+    the pivot and the JSON endpoint read a few rows per period instead of
+    aggregating every milestone.
+    """
+    _name = 'project.payment.forecast'
+    _description = 'Payment Forecast'
+    _order = 'period, date, customer_id'
+
+    period = fields.Selection(FORECAST_PERIODS, string='Period', required=True, readonly=True, index=True)
+    date = fields.Date(string='Period Start', required=True, readonly=True, index=True)
+    customer_id = fields.Many2one('res.partner', string='Customer', readonly=True)
+    user_id = fields.Many2one('res.users', string='Project Manager', readonly=True)
+    milestone_type = fields.Selection(MILESTONE_TYPES, string='Type', readonly=True)
+    planned_count = fields.Integer(string='Planned', readonly=True,
+                                   help="Milestones planned in the period.")
+    done_count = fields.Integer(string='Paid', readonly=True,
+                                help="Milestones planned in the period and already paid.")
+    pending_count = fields.Integer(string='Open', readonly=True,
+                                   help="Milestones planned in the period and not paid yet.")
+    late_count = fields.Integer(string='Paid Late', readonly=True,
+                                help="Milestones planned in the period and paid after their planned date.")
+    actual_count = fields.Integer(string='Paid in Period', readonly=True,
+                                  help="Milestones actually paid in the period, whatever their planned date.")
+
+    @api.model
+    def _cron_rebuild_forecast(self):
+        """Rebuild the whole table; it holds one row per bucket, not per milestone."""
+        self.env['project.payment.milestone'].flush_model()
+        self.env['project.project'].flush_model(['user_id'])
+        self.env.cr.execute(f"DELETE FROM {self._table}")
+        for period, _label in FORECAST_PERIODS:
+            # تاريخ الدفع الفعلي: actual_date وإلا تاريخ الضغط على Done
+            self.env.cr.execute(f"""
+                INSERT INTO {self._table}
+                       (period, date, customer_id, user_id, milestone_type,
+                        planned_count, done_count, pending_count, late_count, actual_count,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT %(period)s, bucket, customer_id, user_id, milestone_type,
+                       SUM(planned), SUM(done), SUM(planned) - SUM(done), SUM(late), SUM(actual),
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM (
+                        SELECT date_trunc(%(period)s, m.planned_date)::date AS bucket,
+                               m.customer_id, p.user_id, m.milestone_type,
+                               1 AS planned,
+                               (m.state = 'done')::int AS done,
+                               (m.state = 'done' AND COALESCE(m.actual_date, m.done_date::date) > m.planned_date)::int AS late,
+                               0 AS actual
+                          FROM project_payment_milestone m
+                          JOIN project_project p ON p.id = m.project_id
+                         WHERE m.planned_date IS NOT NULL
+                     UNION ALL
+                        SELECT date_trunc(%(period)s, COALESCE(m.actual_date, m.done_date::date))::date,
+                               m.customer_id, p.user_id, m.milestone_type,
+                               0, 0, 0, 1
+                          FROM project_payment_milestone m
+                          JOIN project_project p ON p.id = m.project_id
+                         WHERE m.state = 'done' AND COALESCE(m.actual_date, m.done_date::date) IS NOT NULL
+                       ) items
+              GROUP BY bucket, customer_id, user_id, milestone_type
+            """, {'period': period, 'uid': self.env.uid})
+        self.invalidate_model()
+        _logger.info("Payment forecast rebuilt: %d rows", self.search_count([]))
+
+    @api.model
+    def _get_horizons(self, horizons=FORECAST_HORIZONS):
+        """Open milestones overdue and due within each horizon (days), from the milestone index."""
+        today = fields.Date.today()
+        self.env['project.payment.milestone'].flush_model(['state', 'planned_date'])
+        filters = ", ".join(
+            f"COUNT(*) FILTER (WHERE planned_date >= %(today)s AND planned_date < %(end_{days})s)"
+            for days in horizons
+        )
+        params = {'today': today, 'end': today + timedelta(days=max(horizons))}
+        params.update({f'end_{days}': today + timedelta(days=days) for days in horizons})
+        self.env.cr.execute(f"""
+            SELECT COUNT(*) FILTER (WHERE planned_date < %(today)s), {filters}
+              FROM project_payment_milestone
+             WHERE state != 'done' AND planned_date < %(end)s
+        """, params)
+        overdue, *counts = self.env.cr.fetchone()
+        return {'overdue': overdue, **{str(days): count for days, count in zip(horizons, counts)}}
+
+    @api.model
+    def get_forecast_data(self, period='month', date_from=None, date_to=None, groupby=None):
+        """Forecast rows of ``period`` grouped by date and the optional ``groupby`` fields."""
+        domain = [('period', '=', period)]
+        if date_from:
+            domain.append(('date', '>=', date_from))
+        if date_to:
+            domain.append(('date', '<=', date_to))
+        groupby = [fname for fname in (groupby or []) if fname in ('customer_id', 'user_id', 'milestone_type')]
+        measures = ['planned_count', 'done_count', 'pending_count', 'late_count', 'actual_count']
+        rows = []
+        for group in self._read_group(domain, ['date:day', *groupby], [f'{fname}:sum' for fname in measures]):
+            date, *keys = group[:len(groupby) + 1]
+            row = {'date': fields.Date.to_string(date)}
+            for fname, key in zip(groupby, keys):
+                row[fname] = [key.id, key.display_name] if isinstance(key, models.BaseModel) and key else key or False
+            row.update(zip(measures, group[len(groupby) + 1:]))
+            rows.append(row)
+        return {
+            'period': period,
+            'rows': rows,
+            'horizons': self._get_horizons(),
+        }
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from datetime import timedelta
+from odoo.exceptions import UserError
+from markupsafe import Markup
+
+MILESTONE_TYPES = [
+    ('contract', 'Contract'),
+    ('uat', 'UAT'),
+    ('live', 'Live'),
+    ('installment', 'Installment'),
+]
+MAX_SNOOZE_COUNT = 2
+SNOOZE_DAYS = 3
+
+
+class ProjectPaymentMilestone(models.Model):
+    """One due item of a payment: contract, UAT, live or a support installment."""
+    _name = 'project.payment.milestone'
+    _description = 'Project Payment Milestone'
+    _order = 'payment_id, sequence, planned_date, id'
+
+    payment_id = fields.Many2one(
+        'project.payment', string='Payment', required=True, ondelete='cascade', index=True
+    )
+    project_id = fields.Many2one(related='payment_id.project_id', store=True)
+    customer_id = fields.Many2one(related='payment_id.customer_id', store=True)
+    milestone_type = fields.Selection(MILESTONE_TYPES, string='Type', required=True, default='installment')
+    sequence = fields.Integer(string='Sequence', default=10)
+    planned_date = fields.Date(string='Planned Date')
+    actual_date = fields.Date(string='Actual Date')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('notified', 'Notified'),
+        ('snoozed', 'Snoozed'),
+        ('done', 'Done'),
+    ], string='Status', default='pending', required=True)
+    snoozed_until = fields.Date(string='Snoozed Until')
+    snooze_count = fields.Integer(string='Snooze Count', default=0)
+    last_notified = fields.Datetime(string='Last Notified')
+    done_date = fields.Datetime(string='Done Date')
+
+    def init(self):
+        # الـ cron يبحث بـ state + نطاق planned_date
+        tools.create_index(
+            self.env.cr, 'project_payment_milestone_state_planned_date_index',
+            self._table, ['state', 'planned_date'],
+        )
+
+    @api.depends('milestone_type', 'planned_date')
+    def _compute_display_name(self):
+        labels = dict(MILESTONE_TYPES)
+        for milestone in self:
+            name = labels.get(milestone.milestone_type, '')
+            if milestone.planned_date:
+                name = f"{name} ({milestone.planned_date})"
+            milestone.display_name = name
+
+    # -------------------- Actions --------------------
+
+    def action_done(self):
+        """Mark the milestones done in one write, with one chatter summary per payment."""
+        milestones = self.filtered(lambda m: m.state != 'done')
+        milestones.write({'state': 'done', 'done_date': fields.Datetime.now()})
+        milestones._post_summary("<strong>Done</strong> ✅")
+        return True
+
+    def action_snooze(self):
+        """Snooze the milestones for SNOOZE_DAYS days.
+
+        The limit is checked for the whole selection before anything is
+        written; milestones are then written in one statement per snooze count.
+        """
+        milestones = self.filtered(lambda m: m.state != 'done')
+        blocked = milestones.filtered(lambda m: m.snooze_count >= MAX_SNOOZE_COUNT)
+        if blocked:
+            raise UserError(
+                f"Cannot snooze more than {MAX_SNOOZE_COUNT} times:\n"
+                + "\n".join(f"- {m.project_id.display_name}: {m.display_name}" for m in blocked))
+        snooze_date = fields.Date.today() + timedelta(days=SNOOZE_DAYS)
+        for snooze_count, group in milestones.grouped('snooze_count').items():
+            group.write({
+                'state': 'snoozed',
+                'snoozed_until': snooze_date,
+                'snooze_count': snooze_count + 1,
+            })
+        # بعد انتهاء الـ snooze يُرسل التذكير من جديد لكل المستلمين
+        self.env['reminder.ledger']._forget_sent(self._name, milestones.ids)
+        milestones._post_summary(f"snoozed until <strong>{snooze_date}</strong>")
+        return True
+
+    def _post_summary(self, label):
+        """One chatter message per payment listing its milestones of ``self``."""
+        for payment, milestones in self.grouped('payment_id').items():
+            names = ", ".join(milestones.mapped('display_name'))
+            payment.message_post(body=Markup("%s %s") % (names, Markup(label)))
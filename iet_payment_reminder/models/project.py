@@ -8,8 +8,12 @@ class Project(models.Model):
     payment_count = fields.Integer(compute='_compute_payment_count', string="Payment Count")
 
     def _compute_payment_count(self):
+        # استعلام واحد لكل المشاريع المعروضة
+        counts = dict(self.env['project.payment']._read_group(
+            [('project_id', 'in', self._origin.ids)], ['project_id'], ['__count'],
+        ))
         for project in self:
-            project.payment_count = self.env['project.payment'].search_count([('project_id', '=', project.id)])
+            project.payment_count = counts.get(project._origin, 0)
 
     def action_view_payments(self):
         self.ensure_one()
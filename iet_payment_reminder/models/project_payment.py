@@ -1,7 +1,19 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
+from odoo.tools import split_every
+from collections import defaultdict
 from datetime import timedelta
-from odoo.exceptions import UserError
+from markupsafe import Markup
+from .payment_milestone import MILESTONE_TYPES
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+REMINDER_DAYS = 7
+FINAL_REMINDER_DAYS = 1
+# دفعة كبيرة حتى يصل لكل مستلم digest واحد في الصباح المعتاد
+REMINDER_BATCH_SIZE = 500
 
 
 class ProjectPayment(models.Model):
@@ -19,14 +31,12 @@ class ProjectPayment(models.Model):
         'res.partner', string='Customer',
         related='project_id.partner_id', store=True, readonly=True,tracking=True
     )
-    contract_payment_date = fields.Date(string='Planed Contract Payment', tracking=True)
-    uat_due_payment = fields.Date(string='Planed UAT Due Payment', tracking=True)
-    live_due_payment = fields.Date(string='Planed Live Due Payment', tracking=True)
-    actual_contract_payment_date = fields.Date(string='Actual Contract Payment', tracking=True)
-    actual_uat_due_payment = fields.Date(string='Actual UAT Due Payment', tracking=True)
-    actual_live_due_payment = fields.Date(string='Actual Live Due Payment', tracking=True)
     notes = fields.Text(string='Notes')
 
+    # -------------------- Milestones --------------------
+    # سطر لكل دفعة مستحقة (Contract / UAT / Live / Installments)
+    milestone_ids = fields.One2many('project.payment.milestone', 'payment_id', string='Milestones')
+
     # -------------------- Installments --------------------
     has_installments = fields.Boolean(string='Has Support', default=False)
     installment_count = fields.Selection([
@@ -35,277 +45,225 @@ class ProjectPayment(models.Model):
         ('3', 'Three Times'),
         ('4', 'Quarterly'),
     ], string='Installment Count', default='1',tracking=True)
-    installment_date_1 = fields.Date(string='Planed Installment Date 1',tracking=True)
-    installment_date_2 = fields.Date(string='Planed Installment Date 2',tracking=True)
-    installment_date_3 = fields.Date(string='Planed Installment Date 3',tracking=True)
-    installment_date_4 = fields.Date(string='Planed Installment Date 4',tracking=True)
-    actual_installment_date_1 = fields.Date(string='Actual Installment Date 1',tracking=True)
-    actual_installment_date_2 = fields.Date(string='Actual Installment Date 2',tracking=True)
-    actual_installment_date_3 = fields.Date(string='Actual Installment Date 3',tracking=True)
-    actual_installment_date_4 = fields.Date(string='Actual Installment Date 4',tracking=True)
-
-    # -------------------- Notification & Snooze --------------------
-    contract_notification_sent = fields.Boolean(string='Contract Notified', default=False)
-    contract_snoozed_until = fields.Date(string='Contract Snoozed Until')
-    contract_snooze_count = fields.Integer(string='Contract Snooze Count', default=0)
-
-    uat_notification_sent = fields.Boolean(string='UAT Notified', default=False)
-    uat_snoozed_until = fields.Date(string='UAT Snoozed Until')
-    uat_snooze_count = fields.Integer(string='UAT Snooze Count', default=0)
-
-    live_notification_sent = fields.Boolean(string='Live Notified', default=False)
-    live_snoozed_until = fields.Date(string='Live Snoozed Until')
-    live_snooze_count = fields.Integer(string='Live Snooze Count', default=0)
-
-    # -------------------- Done Checkboxes --------------------
-    contract_done = fields.Boolean(string='Contract Done', default=False,tracking=True)
-    uat_done = fields.Boolean(string='UAT Done', default=False,tracking=True)
-    live_done = fields.Boolean(string='Live Done', default=False,tracking=True)
-    contract_appear = fields.Boolean(default=False)
-    uat_appear = fields.Boolean(default=False)
-    live_appear = fields.Boolean(default=False)
-
-    contract_done_date = fields.Datetime(string='Contract Done Date')
-    uat_done_date = fields.Datetime(string='UAT Done Date' )
-    live_done_date = fields.Datetime(string='Live Done Date' )
 
     # -------------------- State --------------------
     state = fields.Selection([
         ('pending', 'Draft'),
-        ('snoozed_contract', 'Snoozed Contract'),
-        ('snoozed_uat', 'Snoozed UAT'),
-        ('snoozed_live', 'Snoozed Live'),
+        ('snoozed', 'Snoozed'),
         ('completed', 'Completed'),
-    ], string='Status', default='pending', tracking=True)
+    ], string='Status', compute='_compute_state', store=True, default='pending', tracking=True)
+
+    @api.depends('milestone_ids.state')
+    def _compute_state(self):
+        """حالة الـ payment حسب حالة الـ milestones"""
+        for payment in self:
+            states = set(payment.milestone_ids.mapped('state'))
+            if 'snoozed' in states:
+                payment.state = 'snoozed'
+            elif states and states == {'done'}:
+                payment.state = 'completed'
+            else:
+                payment.state = 'pending'
 
     # -------------------- Actions --------------------
 
-    def action_contract_done(self):
-        self.write({
-            'contract_done': True,
-            'contract_notification_sent': True,
-            'contract_done_date': fields.Datetime.now(),
-        })
-        self._update_state()
-        self.message_post(body="Contract <strong>Done</strong> ✅")
-        return True
+    def action_milestones_done(self):
+        """Mark every open milestone of the payments done."""
+        return self.milestone_ids.action_done()
 
-    def action_uat_done(self):
-        self.write({
-            'uat_done': True,
-            'uat_notification_sent': True,
-            'uat_done_date': fields.Datetime.now(),
-        })
-        self._update_state()
-        self.message_post(body="UAT <strong>Done</strong> ✅")
-        return True
-
-    def action_live_done(self):
-        self.write({
-            'live_done': True,
-            'live_notification_sent': True,
-            'live_done_date': fields.Datetime.now(),
-        })
-        self._update_state()
-        self.message_post(body="Live <strong>Done</strong> ✅")
-        return True
-
-    def _update_state(self):
-        """تحديث الـ state حسب أي نوع تم عمل Done أو Snooze"""
-        if self.contract_snoozed_until and not self.contract_done:
-            self.state = 'snoozed_contract'
-        elif self.uat_snoozed_until and not self.uat_done:
-            self.state = 'snoozed_uat'
-        elif self.live_snoozed_until and not self.live_done:
-            self.state = 'snoozed_live'
-        elif self.contract_done and self.uat_done and self.live_done:
-            self.state = 'completed'
-        else:
-            self.state = 'pending'
-
-    def action_snooze_contract(self):
-        if self.contract_snooze_count >= 2:
-            raise UserError("Cannot snooze Contract more than 2 times.")
-        snooze_date = fields.Date.today() + timedelta(days=3)
-        self.write({
-            'contract_snoozed_until': snooze_date,
-            'contract_notification_sent': False,
-            'contract_snooze_count': self.contract_snooze_count + 1,
-        })
-        self._update_state()
-        self.message_post(
-            body=f"Contract snoozed until <strong>{snooze_date}</strong> (#{self.contract_snooze_count}/2).")
-        return True
-
-    def action_snooze_uat(self):
-        if self.uat_snooze_count >= 2:
-            raise UserError("Cannot snooze UAT more than 2 times.")
-        snooze_date = fields.Date.today() + timedelta(days=3)
-        self.write({
-            'uat_snoozed_until': snooze_date,
-            'uat_notification_sent': False,
-            'contract_appear': True,
-            'uat_snooze_count': self.uat_snooze_count + 1,
-        })
-        self._update_state()
-        self.message_post(body=f"UAT snoozed until <strong>{snooze_date}</strong> (#{self.uat_snooze_count}/2).")
-        return True
-
-    def action_snooze_live(self):
-        if self.live_snooze_count >= 2:
-            raise UserError("Cannot snooze Live more than 2 times.")
-        snooze_date = fields.Date.today() + timedelta(days=3)
-        self.write({
-            'live_snoozed_until': snooze_date,
-            'live_notification_sent': False,
-            'live_snooze_count': self.live_snooze_count + 1,
-        })
-        self._update_state()
-        self.message_post(body=f"Live snoozed until <strong>{snooze_date}</strong> (#{self.live_snooze_count}/2).")
-        return True
+    def action_snooze_milestones(self):
+        """Snooze the notified milestones of the payments."""
+        return self.milestone_ids.filtered(lambda m: m.state == 'notified').action_snooze()
 
     def action_back_to_pending(self):
-        self.write({
-            'contract_snoozed_until': False,
-            'uat_snoozed_until': False,
-            'live_snoozed_until': False,
-            'contract_done': False,
-            'uat_done': False,
-            'live_done': False,
-            'contract_notification_sent': False,
-            'uat_notification_sent': False,
-            'live_notification_sent': False,
+        self.milestone_ids.write({
+            'state': 'pending',
+            'snoozed_until': False,
+            'done_date': False,
         })
-        self._update_state()
-        self.message_post(body="Returned to <strong>Pending</strong>.")
+        self.env['reminder.ledger']._forget_sent('project.payment.milestone', self.milestone_ids.ids)
+        for payment in self:
+            payment.message_post(body="Returned to <strong>Pending</strong>.")
         return True
 
     # ==================== Cron Job ====================
 
     @api.model
     def _send_payment_notifications(self):
+        """Remind the milestones due in [today, today + 7 days].
+
+        Both searches use the (state, planned_date) index. Milestones are
+        processed in batches committed one by one: a notified milestone leaves
+        the due domain and every recipient is logged in the reminder ledger in
+        the same transaction as its queued mail, so a crashed run resumes
+        where it stopped without sending twice.
+        """
         today = fields.Date.today()
-        one_week_later = today + timedelta(days=7)
-        one_day_before = today + timedelta(days=1)
-
-        records = self.search([
-            '|', '|',
-            ('contract_payment_date', '<=', one_week_later),
-            ('uat_due_payment', '<=', one_week_later),
-            ('live_due_payment', '<=', one_week_later),
-            ('state', '!=', 'completed')
+        window_end = today + timedelta(days=REMINDER_DAYS)
+        one_day_before = today + timedelta(days=FINAL_REMINDER_DAYS)
+        Milestone = self.env['project.payment.milestone']
+
+        due = Milestone.search([
+            ('planned_date', '>=', today),
+            ('planned_date', '<=', window_end),
+            '|', ('state', '=', 'pending'),
+            '&', ('state', '=', 'snoozed'), ('snoozed_until', '<=', today),
+        ])
+        final = Milestone.search([
+            ('planned_date', '=', one_day_before),
+            ('state', 'in', ('pending', 'notified', 'snoozed')),
         ])
 
-        for payment in records:
-            # --- Contract ---
-            if (payment.contract_payment_date <= one_week_later
-                    and not payment.contract_notification_sent
-                    and payment.state in ['pending', 'snoozed']
-                    and (not payment.contract_snoozed_until or payment.contract_snoozed_until <= today)):
-                self._send_notification(payment, 'Contract', payment.contract_payment_date)
-                payment.write({'contract_notification_sent': True, 'state': 'pending'})
-
-            if (payment.contract_payment_date == one_day_before and payment.state != 'completed'):
-                self._send_final_notification(payment, 'Contract', payment.contract_payment_date)
-
-            # --- UAT ---
-            if (payment.uat_due_payment <= one_week_later
-                    and not payment.uat_notification_sent
-                    and payment.state in ['pending', 'snoozed']
-                    and (not payment.uat_snoozed_until or payment.uat_snoozed_until <= today)):
-                self._send_notification(payment, 'UAT', payment.uat_due_payment)
-                payment.write({'uat_notification_sent': True, 'state': 'pending'})
-
-            if (payment.uat_due_payment == one_day_before and payment.state != 'completed'):
-                self._send_final_notification(payment, 'UAT', payment.uat_due_payment)
-
-            # --- Live ---
-            if (payment.live_due_payment <= one_week_later
-                    and not payment.live_notification_sent
-                    and payment.state in ['pending', 'snoozed']
-                    and (not payment.live_snoozed_until or payment.live_snoozed_until <= today)):
-                self._send_notification(payment, 'Live', payment.live_due_payment)
-                payment.write({'live_notification_sent': True, 'state': 'pending'})
-
-            if (payment.live_due_payment == one_day_before and payment.state != 'completed'):
-                self._send_final_notification(payment, 'Live', payment.live_due_payment)
+        # الـ milestone المستحق غدًا يأخذ التذكير النهائي فقط
+        final_ids = set(final.ids)
+        due_ids = set(due.ids)
+        items = [(milestone, milestone.id in final_ids) for milestone in due]
+        items += [(milestone, True) for milestone in final if milestone.id not in due_ids]
 
-    # ==================== Notifications ====================
+        for batch in split_every(REMINDER_BATCH_SIZE, items, list):
+            self._send_reminders(batch)
+            notified = Milestone.browse([milestone.id for milestone, _is_final in batch
+                                         if milestone.id in due_ids])
+            notified.write({'state': 'notified', 'last_notified': fields.Datetime.now()})
+            self._commit_batch()
 
-    def _send_notification(self, payment, payment_type, payment_date):
-        self._send_reminder(payment, payment_type, payment_date, is_final=False)
+        _logger.info("Payment reminders: %d due, %d final", len(due), len(final))
 
-    def _send_final_notification(self, payment, payment_type, payment_date):
-        self._send_reminder(payment, payment_type, payment_date, is_final=True)
+    def _commit_batch(self):
+        # لا commit داخل الاختبارات
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
 
-    def _send_reminder(self, payment, payment_type, payment_date, is_final=False):
-        project = payment.project_id
-        manager = project.user_id
-        customer = payment.customer_id
+    # ==================== Notifications ====================
 
+    def _get_reminder_partners(self, milestone):
+        """مدير المشروع + العميل"""
         partners = set()
+        manager = milestone.project_id.user_id
         if manager and manager.partner_id:
             partners.add(manager.partner_id.id)
-        if customer:
-            partners.add(customer.id)
-
-        if not partners:
+        if milestone.customer_id:
+            partners.add(milestone.customer_id.id)
+        return partners
+
+    def _send_reminders(self, items):
+        """Queue the reminders of ``items``, a list of ``(milestone, is_final)``.
+
+        Recipients get one digest mail listing all their items, created in
+        bulk and left to the mail cron. Each reminded milestone gets one
+        activity for the project manager, and each payment one short chatter
+        note. Recipients already in the reminder ledger are skipped.
+        """
+        Milestone = self.env['project.payment.milestone']
+        Ledger = self.env['reminder.ledger']
+        milestone_ids = [milestone.id for milestone, _is_final in items]
+        already_sent = {
+            threshold: Ledger._get_sent(Milestone._name, milestone_ids, threshold)
+            for threshold in (REMINDER_DAYS, FINAL_REMINDER_DAYS)
+        }
+
+        digests = defaultdict(list)
+        sent_keys = defaultdict(list)
+        reminded = []
+        for milestone, is_final in items:
+            threshold = FINAL_REMINDER_DAYS if is_final else REMINDER_DAYS
+            keys = [
+                (milestone.id, 'planned_date', milestone.planned_date, partner_id)
+                for partner_id in self._get_reminder_partners(milestone)
+            ]
+            keys = [key for key in keys if key not in already_sent[threshold]]
+            if not keys:
+                continue
+            reminded.append((milestone, is_final))
+            sent_keys[threshold] += keys
+            for key in keys:
+                digests[key[3]].append((milestone, is_final))
+
+        if not reminded:
             return
 
-        days_left = (payment_date - fields.Date.today()).days
-        if is_final:
-            subject = f"FINAL REMINDER: {project.name} - {payment_type} Due TOMORROW"
-            summary = f"FINAL: {payment_type} Due TOMORROW"
-            body_html = f"""
-            <p style="color: red; font-weight: bold;">URGENT: FINAL REMINDER</p>
-            <p>The <strong>{payment_type}</strong> payment for project <strong>{project.name}</strong> 
-            is due <strong>TOMORROW</strong> on <strong>{payment_date}</strong>.</p>
-            <ul>
-                <li><strong>Project:</strong> {project.name}</li>
-                <li><strong>Customer:</strong> {customer.name if customer else 'N/A'}</li>
-                <li><strong>Type:</strong> {payment_type}</li>
-                <li><strong>Due Date:</strong> {payment_date}</li>
-            </ul>
-            <p style="color: red;"><strong>Act immediately.</strong></p>
-            """
-        else:
-            subject = f"Reminder: {project.name} - {payment_type} Due in {days_left} Day(s)"
-            summary = f"{payment_type} Due in {days_left} days"
-            body_html = f"""
-            <p>The <strong>{payment_type}</strong> payment for project <strong>{project.name}</strong> 
-            is due in <strong>{days_left} day(s)</strong> on <strong>{payment_date}</strong>.</p>
-            <ul>
-                <li><strong>Project:</strong> {project.name}</li>
-                <li><strong>Customer:</strong> {customer.name if customer else 'N/A'}</li>
-                <li><strong>Type:</strong> {payment_type}</li>
-                <li><strong>Due Date:</strong> {payment_date}</li>
-            </ul>
-            <p>Please take action.</p>
-            """
+        for threshold, keys in sent_keys.items():
+            Ledger._log_sent(Milestone._name, threshold, keys)
 
-        # Send Email
-        self.env['mail.mail'].sudo().create({
-            'subject': subject,
-            'body_html': body_html,
-            'email_from': self.env.company.email or 'no-reply@yourcompany.com',
-            'recipient_ids': [(6, 0, list(partners))],
-        }).send()
+        # Queue one digest per recipient (sent by the mail cron)
+        email_from = self.env.company.email or 'no-reply@yourcompany.com'
+        self.env['mail.mail'].sudo().create([
+            dict(self._prepare_digest_mail(entries), email_from=email_from, recipient_ids=[(6, 0, [partner_id])])
+            for partner_id, entries in digests.items()
+        ])
 
-        # Schedule Activity
+        # Schedule Activities
         activity_type = self.env.ref('mail.mail_activity_data_todo')
-        for partner_id in partners:
-            payment.activity_schedule(
-                activity_type_id=activity_type.id,
-                summary=summary,
-                note=body_html,
-                date_deadline=payment_date,
-                user_id=manager.id if manager else self.env.uid,
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        self.env['mail.activity'].create([{
+            'res_model_id': res_model_id,
+            'res_id': milestone.payment_id.id,
+            'activity_type_id': activity_type.id,
+            'summary': self._get_reminder_summary(milestone, is_final),
+            'date_deadline': milestone.planned_date,
+            'user_id': milestone.project_id.user_id.id or self.env.uid,
+        } for milestone, is_final in reminded])
+
+        # Post in Chatter: one short note per payment
+        lines_by_payment = defaultdict(list)
+        for milestone, is_final in reminded:
+            lines_by_payment[milestone.payment_id].append(self._get_reminder_summary(milestone, is_final))
+        for payment, lines in lines_by_payment.items():
+            payment.message_post(
+                body=Markup("Reminder sent: %s") % ", ".join(lines),
+                message_type='notification',
+                subtype_xmlid='mail.mt_note',
+            )
+
+    def _get_reminder_summary(self, milestone, is_final):
+        payment_type = dict(MILESTONE_TYPES)[milestone.milestone_type]
+        if is_final:
+            return f"FINAL: {payment_type} Due TOMORROW"
+        days_left = (milestone.planned_date - fields.Date.today()).days
+        return f"{payment_type} Due in {days_left} days"
+
+    def _prepare_digest_mail(self, entries):
+        """Subject and body of the digest listing ``entries`` for one recipient."""
+        has_final = any(is_final for _milestone, is_final in entries)
+        if has_final:
+            subject = f"FINAL REMINDER: {len(entries)} Payment(s) Due Soon"
+        else:
+            subject = f"Reminder: {len(entries)} Payment(s) Due Soon"
+
+        rows = Markup()
+        for milestone, is_final in sorted(entries, key=lambda entry: (entry[0].planned_date, entry[0].id)):
+            days_left = (milestone.planned_date - fields.Date.today()).days
+            due_label = Markup('<strong style="color: red;">TOMORROW</strong>') if is_final else f"in {days_left} day(s)"
+            rows += Markup("""
+                <tr>
+                    <td>%s</td>
+                    <td>%s</td>
+                    <td>%s</td>
+                    <td>%s</td>
+                    <td>%s</td>
+                </tr>""") % (
+                milestone.project_id.name,
+                milestone.customer_id.name or 'N/A',
+                dict(MILESTONE_TYPES)[milestone.milestone_type],
+                milestone.planned_date,
+                due_label,
             )
 
-        # Post in Chatter
-        payment.message_post(
-            body=body_html,
-            subject=subject,
-            message_type='notification',
-            subtype_xmlid='mail.mt_comment',
+        body_html = Markup("""
+            %s
+            <p>The following payments are due soon:</p>
+            <table border="1" cellpadding="4" style="border-collapse: collapse;">
+                <tr>
+                    <th>Project</th>
+                    <th>Customer</th>
+                    <th>Type</th>
+                    <th>Due Date</th>
+                    <th>Due</th>
+                </tr>%s
+            </table>
+            <p>Please take action.</p>
+            """) % (
+            Markup('<p style="color: red; font-weight: bold;">URGENT: FINAL REMINDER</p>') if has_final else '',
+            rows,
         )
+        return {'subject': subject, 'body_html': body_html}
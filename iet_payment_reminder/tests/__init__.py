@@ -0,0 +1,6 @@
+from . import test_payment_reminder
+from . import test_payment_milestone
+from . import test_payment_digest
+from . import test_payment_forecast
+from . import test_payment_actions
+from . import test_payment_count
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+from odoo.addons.iet_payment_reminder.models.payment_milestone import MAX_SNOOZE_COUNT, SNOOZE_DAYS
+
+
+class TestPaymentActions(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        Payment = cls.env['project.payment']
+        cls.payments = Payment
+        for index in range(2):
+            project = cls.env['project.project'].create({'name': f'Actions Project {index}'})
+            cls.payments |= Payment.create({
+                'project_id': project.id,
+                'milestone_ids': [(0, 0, {
+                    'milestone_type': milestone_type,
+                    'planned_date': cls.today + timedelta(days=5),
+                }) for milestone_type in ('contract', 'uat')],
+            })
+        cls.milestones = cls.payments.milestone_ids
+
+    def _summaries(self, payment, text):
+        return payment.message_ids.filtered(lambda message: text in (message.body or ''))
+
+    def test_bulk_done(self):
+        self.milestones.action_done()
+        self.assertEqual(set(self.milestones.mapped('state')), {'done'})
+        self.assertTrue(all(self.milestones.mapped('done_date')))
+        self.assertEqual(set(self.payments.mapped('state')), {'completed'})
+        for payment in self.payments:
+            self.assertEqual(len(self._summaries(payment, 'Done')), 1)
+
+    def test_payment_state_follows_milestones(self):
+        first, second = self.payments[0].milestone_ids
+        first.action_done()
+        self.assertEqual(self.payments[0].state, 'pending')
+        second.action_snooze()
+        self.assertEqual(self.payments[0].state, 'snoozed')
+        self.payments[0].action_back_to_pending()
+        self.assertEqual(self.payments[0].state, 'pending')
+
+    def test_bulk_snooze(self):
+        self.milestones[0].snooze_count = 1
+        self.milestones.action_snooze()
+        self.assertEqual(set(self.milestones.mapped('state')), {'snoozed'})
+        self.assertEqual(set(self.milestones.mapped('snoozed_until')), {self.today + timedelta(days=SNOOZE_DAYS)})
+        self.assertEqual(self.milestones.mapped('snooze_count'), [2, 1, 1, 1])
+        for payment in self.payments:
+            self.assertEqual(len(self._summaries(payment, 'snoozed until')), 1)
+
+    def test_snooze_limit_blocks_selection(self):
+        self.milestones[0].snooze_count = MAX_SNOOZE_COUNT
+        with self.assertRaises(UserError):
+            self.milestones.action_snooze()
+        # لا يتغير أي milestone إذا تجاوز أحدها الحد
+        self.assertEqual(set(self.milestones.mapped('state')), {'pending'})
+
+    def test_snooze_notified_only(self):
+        self.env['project.payment']._send_payment_notifications()
+        self.milestones[0].action_done()
+        self.payments.action_snooze_milestones()
+        self.assertEqual(self.milestones[0].state, 'done')
+        self.assertEqual(set(self.milestones[1:].mapped('state')), {'snoozed'})
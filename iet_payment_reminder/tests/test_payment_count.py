@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+
+
+class TestPaymentCount(TransactionCase):
+
+    def test_payment_count(self):
+        projects = self.env['project.project'].create([{'name': f'Count Project {index}'} for index in range(3)])
+        Payment = self.env['project.payment']
+        Payment.create([{'project_id': projects[0].id}, {'project_id': projects[0].id}, {'project_id': projects[1].id}])
+        projects.invalidate_recordset(['payment_count'])
+        self.assertEqual(projects.mapped('payment_count'), [2, 1, 0])
+
+    def test_payment_count_new_record(self):
+        project = self.env['project.project'].new({'name': 'New Project'})
+        self.assertEqual(project.payment_count, 0)
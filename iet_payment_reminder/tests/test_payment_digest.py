@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestPaymentDigest(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        cls.manager = cls.env['res.users'].create({
+            'name': 'Digest Manager',
+            'login': 'digest_manager',
+            'email': 'digest.manager@example.com',
+        })
+        cls.customer = cls.env['res.partner'].create({
+            'name': 'Digest Customer',
+            'email': 'digest.customer@example.com',
+        })
+        cls.payments = cls.env['project.payment']
+        for index in range(2):
+            project = cls.env['project.project'].create({
+                'name': f'Digest Project {index}',
+                'user_id': cls.manager.id,
+                'partner_id': cls.customer.id,
+            })
+            cls.payments |= cls.env['project.payment'].create({
+                'project_id': project.id,
+                'milestone_ids': [(0, 0, {
+                    'milestone_type': milestone_type,
+                    'planned_date': cls.today + timedelta(days=days),
+                }) for milestone_type, days in [('contract', 5), ('uat', 1)]],
+            })
+
+    def _mails(self, partner):
+        return self.env['mail.mail'].search([
+            ('recipient_ids', 'in', partner.ids),
+            ('subject', 'like', 'Payment(s) Due Soon'),
+        ])
+
+    def test_one_digest_per_recipient(self):
+        self.env['project.payment']._send_payment_notifications()
+        for partner in (self.customer, self.manager.partner_id):
+            mails = self._mails(partner)
+            self.assertEqual(len(mails), 1)
+            self.assertEqual(mails.subject, "FINAL REMINDER: 4 Payment(s) Due Soon")
+            self.assertEqual(mails.state, 'outgoing')
+            for payment in self.payments:
+                self.assertIn(payment.project_id.name, mails.body_html)
+
+    def test_activity_per_milestone_and_note_per_payment(self):
+        self.env['project.payment']._send_payment_notifications()
+        for payment in self.payments:
+            activities = payment.activity_ids
+            self.assertEqual(len(activities), 2)
+            self.assertEqual(activities.user_id, self.manager)
+            self.assertEqual(sorted(activities.mapped('summary')),
+                             ["Contract Due in 5 days", "FINAL: UAT Due TOMORROW"])
+            notes = payment.message_ids.filtered(lambda m: 'Reminder sent' in (m.body or ''))
+            self.assertEqual(len(notes), 1)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestPaymentForecast(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.customer = cls.env['res.partner'].create({'name': 'Forecast Customer'})
+        project = cls.env['project.project'].create({
+            'name': 'Forecast Project',
+            'partner_id': cls.customer.id,
+        })
+        cls.payment = cls.env['project.payment'].create({
+            'project_id': project.id,
+            'milestone_ids': [(0, 0, vals) for vals in [
+                # مدفوعة متأخرة في فبراير
+                {'milestone_type': 'contract', 'planned_date': date(2025, 1, 10),
+                 'state': 'done', 'actual_date': date(2025, 2, 5)},
+                {'milestone_type': 'uat', 'planned_date': date(2025, 1, 20)},
+                {'milestone_type': 'installment', 'planned_date': date(2025, 2, 10)},
+            ]],
+        })
+
+    def _rows(self, period):
+        Forecast = self.env['project.payment.forecast']
+        Forecast._cron_rebuild_forecast()
+        data = Forecast.get_forecast_data(period, '2025-01-01', '2025-02-28', ['customer_id'])
+        return [row for row in data['rows'] if row['customer_id'] and row['customer_id'][0] == self.customer.id]
+
+    def test_monthly_forecast(self):
+        rows = self._rows('month')
+        self.assertEqual([row['date'] for row in rows], ['2025-01-01', '2025-02-01'])
+        january, february = rows
+        self.assertEqual(
+            [january[fname] for fname in ('planned_count', 'done_count', 'pending_count', 'late_count', 'actual_count')],
+            [2, 1, 1, 1, 0])
+        self.assertEqual(
+            [february[fname] for fname in ('planned_count', 'done_count', 'pending_count', 'late_count', 'actual_count')],
+            [1, 0, 1, 0, 1])
+
+    def test_weekly_forecast(self):
+        rows = self._rows('week')
+        self.assertEqual(sum(row['planned_count'] for row in rows), 3)
+        self.assertEqual(sum(row['actual_count'] for row in rows), 1)
+        # date_trunc('week') يبدأ الأسبوع يوم الإثنين
+        self.assertTrue(all(fields.Date.from_string(row['date']).weekday() == 0 for row in rows))
+
+    def test_horizons(self):
+        Forecast = self.env['project.payment.forecast']
+        before = Forecast._get_horizons()
+        today = fields.Date.today()
+        self.payment.write({'milestone_ids': [(0, 0, {
+            'milestone_type': 'installment',
+            'planned_date': today + timedelta(days=days),
+        }) for days in (-3, 10, 45, 120)]})
+        after = Forecast._get_horizons()
+        self.assertEqual(after['overdue'] - before['overdue'], 1)
+        self.assertEqual(after['30'] - before['30'], 1)
+        self.assertEqual(after['60'] - before['60'], 2)
+        self.assertEqual(after['90'] - before['90'], 2)
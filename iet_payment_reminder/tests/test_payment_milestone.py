@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestPaymentMilestone(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        cls.customer = cls.env['res.partner'].create({'name': 'Milestone Customer'})
+        cls.project = cls.env['project.project'].create({
+            'name': 'Milestone Project',
+            'partner_id': cls.customer.id,
+        })
+        cls.payment = cls.env['project.payment'].create({
+            'project_id': cls.project.id,
+            'milestone_ids': [(0, 0, {
+                'milestone_type': milestone_type,
+                'planned_date': cls.today + timedelta(days=days),
+            }) for milestone_type, days in [('contract', 3), ('uat', 20), ('installment', -2)]],
+        })
+        cls.contract, cls.uat, cls.installment = cls.payment.milestone_ids.sorted('id')
+
+    def test_milestone_fields(self):
+        self.assertEqual(self.contract.project_id, self.project)
+        self.assertEqual(self.contract.customer_id, self.customer)
+        self.assertEqual(self.contract.display_name, f"Contract ({self.today + timedelta(days=3)})")
+        self.assertEqual(self.payment.state, 'pending')
+
+    def test_only_due_milestones_reminded(self):
+        self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(self.contract.state, 'notified')
+        self.assertTrue(self.contract.last_notified)
+        # خارج نافذة الأيام السبعة أو فات موعده
+        self.assertEqual(self.uat.state, 'pending')
+        self.assertEqual(self.installment.state, 'pending')
+
+    def test_done_milestone_not_reminded(self):
+        self.contract.state = 'done'
+        self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(self.contract.state, 'done')
+        self.assertFalse(self.env['reminder.ledger'].search([
+            ('res_model', '=', 'project.payment.milestone'),
+            ('res_id', '=', self.contract.id),
+        ]))
+
+    def test_payment_deleted_with_milestones(self):
+        milestones = self.payment.milestone_ids
+        self.payment.unlink()
+        self.assertFalse(milestones.exists())
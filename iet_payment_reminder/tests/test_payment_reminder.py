@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from unittest.mock import patch
+from freezegun import freeze_time
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestPaymentReminder(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        cls.manager = cls.env['res.users'].create({
+            'name': 'Payment Manager',
+            'login': 'payment_manager',
+            'email': 'manager@example.com',
+        })
+        cls.customer = cls.env['res.partner'].create({
+            'name': 'Payment Customer',
+            'email': 'customer@example.com',
+        })
+        cls.project = cls.env['project.project'].create({
+            'name': 'Payment Project',
+            'user_id': cls.manager.id,
+            'partner_id': cls.customer.id,
+        })
+        cls.payment = cls.env['project.payment'].create({
+            'project_id': cls.project.id,
+            'milestone_ids': [(0, 0, {
+                'milestone_type': 'contract',
+                'planned_date': cls.today + timedelta(days=5),
+            })],
+        })
+        cls.milestone = cls.payment.milestone_ids
+
+    def _reminder_mails(self, partner):
+        # بدون إشعارات تكليف الأكتيفيتي التي تصل لمدير المشروع
+        return self.env['mail.mail'].search([
+            ('recipient_ids', 'in', partner.ids),
+            ('subject', 'like', 'Payment(s) Due Soon'),
+        ])
+
+    def test_reminder_sent_once(self):
+        self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(self.milestone.state, 'notified')
+        self.assertEqual(len(self._reminder_mails(self.manager.partner_id)), 1)
+        self.assertEqual(len(self._reminder_mails(self.customer)), 1)
+
+        # يوم جديد: لا يُعاد الإرسال
+        self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(len(self._reminder_mails(self.manager.partner_id)), 1)
+
+    def test_reminder_sent_again_after_snooze(self):
+        self.env['project.payment']._send_payment_notifications()
+        self.milestone.action_snooze()
+        self.assertEqual(self.milestone.state, 'snoozed')
+        self.assertEqual(self.payment.state, 'snoozed')
+
+        with freeze_time(self.today + timedelta(days=3)):
+            self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(self.milestone.state, 'notified')
+        self.assertEqual(len(self._reminder_mails(self.manager.partner_id)), 2)
+        self.assertEqual(len(self._reminder_mails(self.customer)), 2)
+
+    def test_reminder_sent_again_after_back_to_pending(self):
+        self.env['project.payment']._send_payment_notifications()
+        self.payment.action_back_to_pending()
+        self.env['project.payment']._send_payment_notifications()
+        self.assertEqual(len(self._reminder_mails(self.customer)), 2)
+
+    def test_final_reminder(self):
+        self.milestone.planned_date = self.today + timedelta(days=1)
+        self.env['project.payment']._send_payment_notifications()
+        mails = self._reminder_mails(self.customer)
+        self.assertEqual(len(mails), 1)
+        self.assertTrue(mails.subject.startswith('FINAL REMINDER'))
+
+    def test_reminders_in_batches(self):
+        self.payment.write({'milestone_ids': [(0, 0, {
+            'milestone_type': 'installment',
+            'planned_date': self.today + timedelta(days=days),
+        }) for days in (0, 2, 7, 8)]})
+        with patch('odoo.addons.iet_payment_reminder.models.project_payment.REMINDER_BATCH_SIZE', 2):
+            self.env['project.payment']._send_payment_notifications()
+        notified = self.payment.milestone_ids.filtered(lambda m: m.state == 'notified')
+        # اليوم حتى 7 أيام فقط
+        self.assertEqual(len(notified), 4)
+        self.assertEqual(self.payment.milestone_ids.filtered(lambda m: m.state == 'pending').planned_date,
+                         self.today + timedelta(days=8))
+        # digest لكل دفعة: 4 milestones على دفعتين
+        self.assertEqual(len(self._reminder_mails(self.customer)), 2)
+        ledger = self.env['reminder.ledger'].search([
+            ('res_model', '=', 'project.payment.milestone'),
+            ('res_id', 'in', notified.ids),
+        ])
+        self.assertEqual(len(ledger), 8)
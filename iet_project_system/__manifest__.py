@@ -1,7 +1,7 @@
 {
     'name': 'IET Project System',
     'version': '1.0',
-    'depends': ['project','iet_custom_project','hr', 'hr_timesheet'],
+    'depends': ['project','iet_custom_project','hr', 'hr_timesheet', 'iet_reminder_ledger'],
     "website": "https://intelligent-experts.com/en/home/",
     'auther': 'IET - SalehElSrief',
     'category': 'Project',
@@ -10,6 +10,7 @@
         'security/project_security.xml',
         'security/ir.model.access.csv',
         'data/ir_cron.xml',
+        'data/project_plan_line_data.xml',
         'views/project_project_views.xml',
         'views/project_task_type.xml',
         'views/project_task.xml',
@@ -0,0 +1,12 @@
+from odoo import http
+from odoo.http import request
+
+
+class ProjectTimeline(http.Controller):
+
+    @http.route('/iet_project_system/timeline', type='json', auth='user')
+    def project_timeline(self, project_ids=None, limit=50, offset=0):
+        """Paginated portfolio timeline: milestones, delays and completion per project."""
+        domain = [('id', 'in', project_ids)] if project_ids else []
+        return request.env['project.project'].get_timeline_data(
+            domain, limit=min(int(limit), 500), offset=int(offset))
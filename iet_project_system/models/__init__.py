@@ -5,3 +5,4 @@ from . import project_plan_line
 from . import project_task_type
 from . import project_task
 from . import project_stakeholder
+from . import resource_calendar
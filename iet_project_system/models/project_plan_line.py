@@ -1,4 +1,5 @@
 from odoo import models, fields, api
+from collections import defaultdict
 from datetime import timedelta, datetime
 from odoo.exceptions import ValidationError
 
@@ -7,7 +8,7 @@ class ProjectPlanLine(models.Model):
     _name = 'project.plan.line'
     _description = 'Project Plan Line'
 
-    project_id = fields.Many2one('project.project', string='Project')
+    project_id = fields.Many2one('project.project', string='Project', index=True)
     name = fields.Char(string='Task Name')
     planned_start_date = fields.Date(string='Planned Start Date')
     actual_start_date = fields.Date(string='Actual Start Date')
@@ -46,6 +47,10 @@ class ProjectPlanLine(models.Model):
 
     sequence = fields.Integer(string='Sequence', default=10)
 
+    # Done/total counters of the tasks under a section, kept up to date by deltas
+    section_task_count = fields.Integer(string='Section Tasks', readonly=True, copy=False)
+    section_done_count = fields.Integer(string='Section Done Tasks', readonly=True, copy=False)
+
     @api.depends('planned_end_date', 'actual_end_date', 'display_type', 'milestone_id', 'project_id.project_plan_line_ids.delay_days')
     def _compute_delay_days(self):
         for rec in self:
@@ -122,9 +127,12 @@ class ProjectPlanLine(models.Model):
             elif not line.display_type:
                 line.milestone_id = current_milestone.id if current_milestone else False
 
-    @api.depends('planned_start_date', 'planned_end_date', 'actual_start_date', 'actual_end_date', 'project_id')
+    @api.depends('planned_start_date', 'planned_end_date', 'actual_start_date', 'actual_end_date', 'project_id',
+                 'project_id.resource_calendar_id')
     # @api.depends('planned_start_date', 'planned_end_date','project_id')
     def _compute_durations(self):
+        # One working-day table per calendar for the whole batch
+        tables = {}
         for record in self:
             record.planned_duration = 0.0
             record.actual_duration = 0.0
@@ -133,6 +141,9 @@ class ProjectPlanLine(models.Model):
 
             if not calendar:
                 continue
+            if calendar.id not in tables:
+                tables[calendar.id] = calendar._get_current_working_day_table()
+            table = tables[calendar.id]
 
             if record.planned_start_date and record.planned_end_date:
                 if record.planned_start_date > record.planned_end_date:
@@ -140,7 +151,8 @@ class ProjectPlanLine(models.Model):
                 record.planned_duration = self._compute_working_days(
                     record.planned_start_date,
                     record.planned_end_date,
-                    calendar
+                    calendar,
+                    table
                 )
 
             if record.actual_start_date and record.actual_end_date:
@@ -149,43 +161,22 @@ class ProjectPlanLine(models.Model):
                 record.actual_duration = self._compute_working_days(
                     record.actual_start_date,
                     record.actual_end_date,
-                    calendar
+                    calendar,
+                    table
                 )
 
-    def _compute_working_days(self, start_date, end_date, calendar):
+    def _compute_working_days(self, start_date, end_date, calendar, table=None):
         if not start_date or not end_date:
             return 0.0
 
         start_dt = start_date if isinstance(start_date, datetime) else datetime.combine(start_date, datetime.min.time())
         end_dt = end_date if isinstance(end_date, datetime) else datetime.combine(end_date, datetime.min.time())
 
-        leaves = self.env['resource.calendar.leaves'].search([
-            ('calendar_id', '=', calendar.id),
-            ('date_from', '<=', end_dt),
-            ('date_to', '>=', start_dt)
-        ])
-
-        working_days = 0.0
         delta = end_dt - start_dt
 
-        for i in range(delta.days + 1):
-            day_dt = start_dt + timedelta(days=i)
-
-            # weekend
-            if day_dt.weekday() in [4, 5]:
-                continue
-
-            # check if holiday
-            is_holiday = False
-            for leave in leaves:
-                leave_start = leave.date_from.replace(tzinfo=None)
-                leave_end = leave.date_to.replace(tzinfo=None)
-                if leave_start <= day_dt <= leave_end:
-                    is_holiday = True
-                    break
-
-            if not is_holiday:
-                working_days += 1.0
+        # Two lookups in the calendar's cumulative working-day table
+        working_days = float(calendar._count_working_days(
+            start_dt.date(), start_dt.date() + timedelta(days=delta.days), table))
 
         # جزء الساعات لو موجودة
         if delta.seconds > 0:
@@ -194,19 +185,40 @@ class ProjectPlanLine(models.Model):
 
         return working_days
 
-    @api.model
-    def create(self, vals):
-        record = super().create(vals)
-        record._create_milestone_if_section()
-        if 'actual_end_date' in vals and not record.display_type:
-            record.write({'actual_end_date': vals['actual_end_date']})  # Trigger the write logic to sync section
-        return record
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._rebuild_completion_counters(records.project_id)
+        records._create_milestone_if_section()
+        for record, vals in zip(records, vals_list):
+            if 'actual_end_date' in vals and not record.display_type:
+                record.write({'actual_end_date': vals['actual_end_date']})  # Trigger the write logic to sync section
+        return records
+
+    def unlink(self):
+        projects = self.project_id
+        res = super().unlink()
+        self._rebuild_completion_counters(projects)
+        return res
 
     def write(self, vals):
+        # Moving lines between projects or turning them into sections changes the
+        # section layout, so the counters are recounted instead of shifted.
+        rebuild_layout = 'project_id' in vals or 'display_type' in vals
+        old_projects = self.project_id
+        done_changed = self.browse()
+        if not rebuild_layout and 'status_done' in vals:
+            done_changed = self.filtered(lambda l: l.status_done != bool(vals['status_done']))
+
         # We need to run the milestone date sync even if skip_task_update is present,
         # but we should avoid infinite loops.
         res = super().write(vals)
 
+        if rebuild_layout:
+            self._rebuild_completion_counters(old_projects | self.project_id)
+        elif done_changed:
+            done_changed._apply_completion_delta(1 if vals['status_done'] else -1)
+
         # Skip only the standard task sync back logic, but allow Milestone sync
         skip_task_sync = self.env.context.get('skip_task_update')
 
@@ -266,33 +278,23 @@ class ProjectPlanLine(models.Model):
         if 'status_done' in vals:
             for line in self:
                 if line.task_id:
-                    if 'status_done' in vals:
-                        for line in self:
-                            if line.task_id:
-                                if vals['status_done']:
-                                    update_vals = {
-                                        'is_closed': True,
-                                        'status_done': True,
-                                        'state': '1_done',
-                                    }
-
-                                    line.task_id.with_context(skip_plan_line_update=True).sudo().write(update_vals)
-
-                                else:
-                                    last_open_stage = self.env['project.task.type'].search(
-                                        [('fold', '=', False)], order='sequence', limit=1
-                                    )
-                                    update_vals = {
-                                        'is_closed': False,
-                                        'status_done': False,
-                                        'state': '01_in_progress',
-                                    }
-                                    # if last_open_stage:
-                                    #     update_vals['stage_id'] = last_open_stage.id
-
-                                    line.task_id.with_context(skip_plan_line_update=True).sudo().write(update_vals)
-
-                            line.project_id._compute_completion_percent()
+                    if vals['status_done']:
+                        update_vals = {
+                            'is_closed': True,
+                            'status_done': True,
+                            'state': '1_done',
+                        }
+
+                        line.task_id.with_context(skip_plan_line_update=True).sudo().write(update_vals)
+
+                    else:
+                        update_vals = {
+                            'is_closed': False,
+                            'status_done': False,
+                            'state': '01_in_progress',
+                        }
+
+                        line.task_id.with_context(skip_plan_line_update=True).sudo().write(update_vals)
 
         for rec in self:
             rec._create_milestone_if_section()
@@ -316,3 +318,116 @@ class ProjectPlanLine(models.Model):
                     super(ProjectPlanLine, rec).write({
                         'milestone_id': milestone.id
                     })
+
+    def _get_section_ids(self):
+        """Return {line_id: section_id} mapping each task line to the section above it."""
+        lines = self.filtered(lambda l: l.project_id and not l.display_type)
+        if not lines:
+            return {}
+        self.flush_model(['project_id', 'display_type'])
+        self.env.cr.execute("""
+            SELECT l.id,
+                   (SELECT MAX(s.id)
+                      FROM project_plan_line s
+                     WHERE s.project_id = l.project_id
+                       AND s.display_type = 'line_section'
+                       AND s.id < l.id)
+              FROM project_plan_line l
+             WHERE l.id IN %s
+        """, [tuple(lines.ids)])
+        return {line_id: section_id for line_id, section_id in self.env.cr.fetchall() if section_id}
+
+    def _apply_completion_delta(self, delta):
+        """Shift the done counters of the lines' sections and projects by ``delta`` per line."""
+        lines = self.filtered('project_id')
+        if not lines:
+            return
+        project_deltas = defaultdict(int)
+        for line in lines:
+            project_deltas[line.project_id.id] += delta
+        section_deltas = defaultdict(int)
+        for section_id in lines._get_section_ids().values():
+            section_deltas[section_id] += delta
+
+        cr = self.env.cr
+        for ids, shift in self._group_ids_by_value(section_deltas):
+            cr.execute("""
+                UPDATE project_plan_line
+                   SET section_done_count = COALESCE(section_done_count, 0) + %s
+                 WHERE id IN %s
+            """, [shift, tuple(ids)])
+        for ids, shift in self._group_ids_by_value(project_deltas):
+            cr.execute("""
+                UPDATE project_project
+                   SET plan_line_done_count = COALESCE(plan_line_done_count, 0) + %s
+                 WHERE id IN %s
+            """, [shift, tuple(ids)])
+        self._completion_counters_modified(lines.project_id)
+
+    @api.model
+    def _group_ids_by_value(self, values):
+        grouped = defaultdict(list)
+        for res_id, value in values.items():
+            if value:
+                grouped[value].append(res_id)
+        return [(ids, value) for value, ids in grouped.items()]
+
+    @api.model
+    def _rebuild_completion_counters(self, projects):
+        """Recount the section and project counters of ``projects`` from scratch.
+
+        A task belongs to the closest section above it (by id), the same rule
+        ``assign_milestones_to_plan_lines`` uses.
+        """
+        projects = projects.exists()
+        if not projects:
+            return
+        self.flush_model(['project_id', 'display_type', 'status_done'])
+        cr = self.env.cr
+        cr.execute("""
+            WITH lines AS (
+                SELECT id, display_type, status_done,
+                       MAX(CASE WHEN display_type = 'line_section' THEN id END)
+                           OVER (PARTITION BY project_id ORDER BY id) AS section_id
+                  FROM project_plan_line
+                 WHERE project_id IN %(project_ids)s
+            ), counts AS (
+                SELECT section_id,
+                       COUNT(*) AS total,
+                       COUNT(*) FILTER (WHERE status_done) AS done
+                  FROM lines
+                 WHERE display_type IS NULL AND section_id IS NOT NULL
+              GROUP BY section_id
+            )
+            UPDATE project_plan_line l
+               SET section_task_count = COALESCE(c.total, 0),
+                   section_done_count = COALESCE(c.done, 0)
+              FROM lines s
+         LEFT JOIN counts c ON c.section_id = s.id
+             WHERE l.id = s.id AND s.display_type = 'line_section'
+        """, {'project_ids': tuple(projects.ids)})
+        cr.execute("""
+            UPDATE project_project p
+               SET plan_line_count = c.total,
+                   plan_line_done_count = c.done
+              FROM (SELECT pp.id,
+                           COUNT(l.id) AS total,
+                           COUNT(l.id) FILTER (WHERE l.status_done) AS done
+                      FROM project_project pp
+                 LEFT JOIN project_plan_line l ON l.project_id = pp.id
+                     WHERE pp.id IN %(project_ids)s
+                  GROUP BY pp.id) c
+             WHERE p.id = c.id
+        """, {'project_ids': tuple(projects.ids)})
+        self._completion_counters_modified(projects)
+
+    @api.model
+    def _completion_counters_modified(self, projects):
+        self.invalidate_model(['section_task_count', 'section_done_count'])
+        projects.invalidate_recordset(['plan_line_count', 'plan_line_done_count'])
+        projects.modified(['plan_line_count', 'plan_line_done_count'])
+
+    @api.model
+    def _init_completion_counters(self):
+        projects = self.env['project.project'].search([('project_plan_line_ids', '!=', False)])
+        self._rebuild_completion_counters(projects)
@@ -1,12 +1,25 @@
 from odoo import models, fields, api
+from odoo.osv import expression
+from collections import defaultdict
 from datetime import timedelta
 import xlsxwriter
 import io
 import base64
 import logging
+from odoo.tools.lru import LRU
 
 _logger = logging.getLogger(__name__)
 
+DEADLINE_REMINDER_DAYS = 10
+DEADLINE_FIELDS = [
+    ('end_project_date', 'Project End'),
+    ('free_support_end_date', 'Free Support End'),
+    ('contract_project_end_date', 'Contract Support End'),
+]
+
+# (dbname, project_id) -> (stamp, milestones); shared by all users of a worker
+_timeline_cache = LRU(4096)
+
 
 class Project(models.Model):
     _inherit = 'project.project'
@@ -21,6 +34,8 @@ class Project(models.Model):
     scope_ids = fields.Many2many('project.scope', string='Scope')
     stakeholder_ids = fields.One2many('project.stakeholder', 'project_id', string='Stakeholder Info')
     completion_percent = fields.Float(string='Completion %', compute='_compute_completion_percent', store=True)
+    plan_line_count = fields.Integer(string='Plan Lines', readonly=True, copy=False)
+    plan_line_done_count = fields.Integer(string='Done Plan Lines', readonly=True, copy=False)
 
     # Dynamic Schedule Thresholds
     threshold_on_track = fields.Integer(string='On Track Threshold (Days)', default=0, help="Delay days up to this value are considered 'On Track'")
@@ -38,14 +53,17 @@ class Project(models.Model):
     def _cron_send_deadline_notifications(self):
         """إرسال تذكيرات قبل انتهاء المواعيد (0-10 أيام)"""
         today = fields.Date.today()
+        window_end = today + timedelta(days=DEADLINE_REMINDER_DAYS)
 
         # المستخدمين المحددين + مدير المشروع
         fixed_users = self.env['res.users'].search([
             ('name', 'in', ['Omar elnabawy', 'Mahmoud Elaskary', 'Shrouq Abdeldaym'])
         ])
 
-        # جلب كل المشاريع
-        projects = self.search([])
+        # المشاريع اللي عندها موعد خلال الفترة فقط (indexed date columns)
+        projects = self.search(expression.OR([
+            [(fname, '>=', today), (fname, '<=', window_end)] for fname, _label in DEADLINE_FIELDS
+        ]))
         if not projects:
             _logger.info("لا توجد مشاريع للتحقق من المواعيد.")
             return
@@ -55,124 +73,192 @@ class Project(models.Model):
         if not activity_type:
             activity_type = self.env['mail.activity.type'].search([('name', '=', 'To Do')], limit=1)
 
+        reminders = []
         for project in projects:
-            # تعريف المواعيد المراد متابعتها
-            dates = {
-                'Project End': project.end_project_date,
-                'Free Support End': project.free_support_end_date,
-                'Contract Support End': project.contract_project_end_date
-            }
-
-            for label, date in dates.items():
-                if not date:
-                    continue
-
-                diff = (date - today).days
-                _logger.info("Project: %s | %s ends in %d days", project.name, label, diff)
-
-                # فقط إذا كان الموعد خلال 0 إلى 10 أيام
-                if 0 <= diff <= 10:
-                    recipients = fixed_users | project.user_id
-                    body = f"Reminder: {label} for project '<strong>{project.name}</strong>' ends on <strong>{date}</strong>."
-
-                    for user in recipients:
-                        if not user.partner_id:
-                            _logger.warning("User %s has no partner_id!", user.name)
-                            continue
-
-                        partner_id = user.partner_id.id
-                        _logger.info("Sending notifications to %s (%s)", user.name, user.email or 'No email')
+            recipients = (fixed_users | project.user_id).filtered('partner_id')
+            for fname, label in DEADLINE_FIELDS:
+                date = project[fname]
+                if date and today <= date <= window_end:
+                    reminders.append((project, fname, label, date, recipients))
+
+        # تذكير واحد فقط لكل موعد ومستلم (reminder.ledger)
+        Ledger = self.env['reminder.ledger']
+        already_sent = Ledger._get_sent(self._name, projects.ids, DEADLINE_REMINDER_DAYS)
+        sent_keys = []
+
+        res_model_id = self.env['ir.model']._get_id('project.project')
+        email_from = self.env.user.email or 'no-reply@iet.com'
+        mail_vals_list = []
+        activity_vals_list = []
+        for project, fname, label, date, recipients in reminders:
+            summary = f"{label} ends on {date}"
+            users = recipients.filtered(
+                lambda u: (project.id, fname, date, u.partner_id.id) not in already_sent)
+            if not users:
+                continue
+            diff = (date - today).days
+            _logger.info("Project: %s | %s ends in %d days, reminding %s", project.name, label, diff, users.mapped('name'))
+            body = f"Reminder: {label} for project '<strong>{project.name}</strong>' ends on <strong>{date}</strong>."
+
+            # 1. رسالة واحدة في الـ Chatter تنبه كل المستلمين (Bell Icon)
+            project.message_post(
+                body=body,
+                partner_ids=users.partner_id.ids,
+                subtype_xmlid='mail.mt_comment'
+            )
 
-                        # 1. رسالة في الـ Chatter
-                        project.message_post(
-                            body=body,
-                            partner_ids=[partner_id],
-                            subtype_xmlid='mail.mt_comment'
-                        )
+            for user in users:
+                sent_keys.append((project.id, fname, date, user.partner_id.id))
+
+                # 2. إيميل في طابور الإرسال بدل الإرسال المباشر
+                if user.email:
+                    mail_vals_list.append({
+                        'subject': f"Deadline Reminder: {project.name} - {label}",
+                        'body_html': f"<p>{body}</p><p>Please check the project for details.</p>",
+                        'email_to': user.email,
+                        'email_from': email_from,
+                    })
+
+                # 3. أكتيفيتي (تظهر في My Activities)
+                activity_vals_list.append({
+                    'res_id': project.id,
+                    'res_model_id': res_model_id,
+                    'activity_type_id': activity_type.id if activity_type else False,
+                    'summary': summary,
+                    'note': f"<p>{body}</p>",
+                    'date_deadline': today,
+                    'user_id': user.id,
+                })
 
-                        # 2. إرسال إيميل (إن وجد)
-                        if user.email:
-                            try:
-                                mail_values = {
-                                    'subject': f"Deadline Reminder: {project.name} - {label}",
-                                    'body_html': f"<p>{body}</p><p>Please check the project for details.</p>",
-                                    'email_to': user.email,
-                                    'email_from': self.env.user.email or 'no-reply@iet.com',
-                                }
-                                mail = self.env['mail.mail'].create(mail_values)
-                                mail.send(auto_commit=True)
-                                _logger.info("Email sent to %s", user.email)
-                            except Exception as e:
-                                _logger.error("Failed to send email to %s: %s", user.email, str(e))
-
-                        # 3. إنشاء أكتيفيتي (تظهر في My Activities)
-                        try:
-                            self.env['mail.activity'].create({
-                                'res_id': project.id,
-                                'res_model_id': self.env['ir.model']._get_id('project.project'),
-                                'activity_type_id': activity_type.id if activity_type else False,
-                                'summary': f"{label} ends in {diff} day(s)",
-                                'note': f"<p>{body}</p>",
-                                'date_deadline': today,  # أو date - 1
-                                'user_id': user.id,
-                            })
-                            _logger.info("Activity created for %s", user.name)
-                        except Exception as e:
-                            _logger.error("Failed to create activity for %s: %s", user.name, str(e))
-
-                        # 4. نوتفيكيشن فوري في الجرس (Bell Icon) - Odoo 18
-                        try:
-                            project.message_notify(
-                                partner_ids=[partner_id],
-                                body=body,
-                                subject=f"{label} Alert: {project.name}",
-                            )
-                            _logger.info("Bell notification sent to %s", user.name)
-                        except Exception as e:
-                            _logger.error("Failed to send notification to %s: %s", user.name, str(e))
-
-    @api.depends('project_plan_line_ids.status_done', 'project_plan_line_ids.milestone_weight',
-                 'project_plan_line_ids.display_type')
+        Ledger._log_sent(self._name, DEADLINE_REMINDER_DAYS, sent_keys)
+        if activity_vals_list:
+            self.env['mail.activity'].create(activity_vals_list)
+        if mail_vals_list:
+            self.env['mail.mail'].create(mail_vals_list)
+            mail_cron = self.env.ref('mail.ir_cron_mail_scheduler_action', raise_if_not_found=False)
+            if mail_cron:
+                mail_cron._trigger()
+        _logger.info("Deadline reminders: %d activities, %d emails queued",
+                     len(activity_vals_list), len(mail_vals_list))
+
+    @api.depends('plan_line_count', 'plan_line_done_count', 'project_plan_line_ids.milestone_weight')
     def _compute_completion_percent(self):
+        # Sections carry their own done/total counters, so only sections and
+        # weighted lines are read instead of the whole plan.
+        lines = self.env['project.plan.line'].search_read([
+            ('project_id', 'in', self._origin.ids),
+            '|', ('display_type', '=', 'line_section'), ('milestone_weight', '>', 0),
+        ], ['project_id', 'display_type', 'milestone_weight', 'section_task_count', 'section_done_count'])
+        lines_by_project = defaultdict(list)
+        for line in lines:
+            lines_by_project[line['project_id'][0]].append(line)
+
         for project in self:
-            # Check if any section has a weight defined
-            has_weights = any(l.milestone_weight > 0 for l in project.project_plan_line_ids)
+            project_lines = lines_by_project[project._origin.id]
+            # Check if any line has a weight defined
+            has_weights = any(l['milestone_weight'] > 0 for l in project_lines)
 
             if not has_weights:
                 # Original Logic
-                total = len(project.project_plan_line_ids)
-                done = len(project.project_plan_line_ids.filtered(lambda l: l.status_done))
+                total = project.plan_line_count
+                done = project.plan_line_done_count
                 project.completion_percent = (done / total) * 100 if total else 0
             else:
                 # Weighted Logic
                 total_percent = 0.0
-                current_weight = 0.0
-                current_tasks = []
-
-                for line in project.project_plan_line_ids:
-                    if line.display_type == 'line_section':
-                        # Process previous section
-                        if current_tasks and current_weight > 0:
-                            done_count = sum(1 for t in current_tasks if t.status_done)
-                            total_count = len(current_tasks)
-                            if total_count > 0:
-                                total_percent += (done_count / total_count) * current_weight
-
-                        # Start new section
-                        current_weight = line.milestone_weight
-                        current_tasks = []
-                    elif not line.display_type:
-                        current_tasks.append(line)
-
-                # Process last section
-                if current_tasks and current_weight > 0:
-                    done_count = sum(1 for t in current_tasks if t.status_done)
-                    total_count = len(current_tasks)
-                    if total_count > 0:
-                        total_percent += (done_count / total_count) * current_weight
+                for section in project_lines:
+                    if section['display_type'] != 'line_section' or section['milestone_weight'] <= 0:
+                        continue
+                    if section['section_task_count'] > 0:
+                        total_percent += (section['section_done_count'] / section['section_task_count']) * section['milestone_weight']
 
                 project.completion_percent = total_percent
 
+    @api.model
+    def get_timeline_data(self, domain, limit=50, offset=0):
+        """Compact timeline of the projects matching ``domain`` for portfolio views.
+
+        Milestones are aggregated in SQL and cached per project until the
+        project or one of its plan lines is written again. The stamp also holds
+        the line count and the section counters: removing a line or moving it
+        to another project does not bump any remaining ``write_date``, and the
+        completion counters are updated in raw SQL.
+        """
+        total = self.search_count(domain)
+        projects = self.search_read(
+            domain, ['name', 'date_start', 'date', 'completion_percent', 'all_delay_days', 'write_date'],
+            limit=limit, offset=offset, order='id')
+        if not projects:
+            return {'total': total, 'limit': limit, 'offset': offset, 'projects': []}
+
+        self.env['project.plan.line'].flush_model()
+        self.env['project.milestone'].flush_model(['deadline'])
+        cr = self.env.cr
+        cr.execute("""
+            SELECT l.project_id, MAX(l.write_date), MAX(m.write_date), COUNT(l.id),
+                   SUM(l.section_task_count), SUM(l.section_done_count)
+              FROM project_plan_line l
+         LEFT JOIN project_milestone m ON m.id = l.milestone_id
+             WHERE l.project_id IN %s
+          GROUP BY l.project_id
+        """, [tuple(p['id'] for p in projects)])
+        line_stamps = {row[0]: row[1:] for row in cr.fetchall()}
+
+        dbname = cr.dbname
+        stamps = {}
+        milestones = {}
+        for project in projects:
+            stamp = (project['write_date'], line_stamps.get(project['id']))
+            stamps[project['id']] = stamp
+            cached = _timeline_cache.get((dbname, project['id']))
+            if cached and cached[0] == stamp:
+                milestones[project['id']] = cached[1]
+
+        missing = [project_id for project_id in stamps if project_id not in milestones]
+        if missing:
+            cr.execute("""
+                SELECT l.project_id, l.id, l.name, l.planned_start_date, l.planned_end_date,
+                       l.actual_end_date, m.deadline, l.delay_days, l.status_done,
+                       l.milestone_weight, l.section_task_count, l.section_done_count
+                  FROM project_plan_line l
+             LEFT JOIN project_milestone m ON m.id = l.milestone_id
+                 WHERE l.project_id IN %s AND l.display_type = 'line_section'
+              ORDER BY l.project_id, l.sequence, l.id
+            """, [tuple(missing)])
+            fetched = {project_id: [] for project_id in missing}
+            for row in cr.fetchall():
+                fetched[row[0]].append({
+                    'id': row[1],
+                    'name': row[2],
+                    'planned_start': fields.Date.to_string(row[3]),
+                    'planned_end': fields.Date.to_string(row[4]),
+                    'actual_end': fields.Date.to_string(row[5]),
+                    'deadline': fields.Date.to_string(row[6]),
+                    'delay_days': row[7] or 0.0,
+                    'done': bool(row[8]),
+                    'weight': row[9] or 0,
+                    'task_count': row[10] or 0,
+                    'done_count': row[11] or 0,
+                })
+            for project_id, sections in fetched.items():
+                _timeline_cache[(dbname, project_id)] = (stamps[project_id], sections)
+            milestones.update(fetched)
+
+        return {
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'projects': [{
+                'id': project['id'],
+                'name': project['name'],
+                'date_start': fields.Date.to_string(project['date_start']),
+                'date_end': fields.Date.to_string(project['date']),
+                'completion': project['completion_percent'],
+                'delay_days': project['all_delay_days'],
+                'milestones': milestones[project['id']],
+            } for project in projects],
+        }
+
     def action_generate_tasks(self):
         Task = self.env['project.task']
         for project in self:
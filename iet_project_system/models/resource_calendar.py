@@ -0,0 +1,108 @@
+from odoo import models, api, tools
+from datetime import date, datetime, time, timedelta
+
+# Working-day tables cover this many years on each side of the current year
+WORKING_DAY_TABLE_YEARS = 5
+
+
+class ResourceCalendar(models.Model):
+    _inherit = 'resource.calendar'
+
+    @api.model
+    @tools.ormcache('calendar_id', 'year', 'leaves_stamp')
+    def _get_working_day_table(self, calendar_id, year, leaves_stamp):
+        """Cumulative working days (Fri/Sat and calendar leaves excluded) around ``year``.
+
+        Returns ``(first_day, cumulative)`` where ``cumulative[i]`` is the number of
+        working days between ``first_day`` and ``first_day + i`` included.
+        ``leaves_stamp`` is only part of the cache key, see ``_get_leaves_stamp``.
+        """
+        first_day = date(year - WORKING_DAY_TABLE_YEARS, 1, 1)
+        last_day = date(year + WORKING_DAY_TABLE_YEARS, 12, 31)
+
+        leaves = self.env['resource.calendar.leaves'].sudo().search_read([
+            ('calendar_id', '=', calendar_id),
+            ('resource_id', '=', False),
+            ('date_from', '<=', datetime.combine(last_day, time.min)),
+            ('date_to', '>=', datetime.combine(first_day, time.min)),
+        ], ['date_from', 'date_to'])
+
+        # A day is a holiday when its midnight falls inside a leave
+        holidays = set()
+        for leave in leaves:
+            leave_start = leave['date_from'].replace(tzinfo=None)
+            leave_end = leave['date_to'].replace(tzinfo=None)
+            day = leave_start.date()
+            if leave_start.time() != time.min:
+                day += timedelta(days=1)
+            while day <= leave_end.date():
+                holidays.add(day)
+                day += timedelta(days=1)
+
+        cumulative = []
+        total = 0
+        day = first_day
+        while day <= last_day:
+            if day.weekday() not in (4, 5) and day not in holidays:
+                total += 1
+            cumulative.append(total)
+            day += timedelta(days=1)
+        return first_day, tuple(cumulative)
+
+    def _get_current_working_day_table(self):
+        """Working-day table of the calendar around the current year (one stamp query)."""
+        self.ensure_one()
+        return self._get_working_day_table(self.id, date.today().year, self._get_leaves_stamp())
+
+    def _count_working_days(self, start_date, end_date, table=None):
+        """Working days between two dates included, answered from the cached table.
+
+        Callers counting many ranges pass the ``table`` of
+        ``_get_current_working_day_table`` so the leaves are stamped once.
+        """
+        self.ensure_one()
+        if not start_date or not end_date or start_date > end_date:
+            return 0
+        first_day, cumulative = table or self._get_current_working_day_table()
+        start_index = (start_date - first_day).days
+        end_index = (end_date - first_day).days
+        if start_index < 0 or end_index >= len(cumulative):
+            return self._count_working_days_slow(start_date, end_date)
+        return cumulative[end_index] - (cumulative[start_index - 1] if start_index else 0)
+
+    def _get_leaves_stamp(self):
+        """Digest of the calendar-wide leaves, used as cache key of the working-day table.
+
+        Changing a leave changes the key, so an outdated table is never looked
+        up again and the rest of the registry cache is left alone. Leaves of a
+        single resource are not part of the table and do not change the key.
+        """
+        self.ensure_one()
+        self.env['resource.calendar.leaves'].flush_model(['calendar_id', 'resource_id', 'date_from', 'date_to'])
+        self.env.cr.execute("""
+            SELECT md5(string_agg(date_from::text || '/' || date_to::text, ',' ORDER BY date_from, date_to))
+              FROM resource_calendar_leaves
+             WHERE calendar_id = %s AND resource_id IS NULL
+        """, [self.id])
+        return self.env.cr.fetchone()[0]
+
+    def _count_working_days_slow(self, start_date, end_date):
+        """Day-by-day count, only used for ranges outside the cached table."""
+        leaves = self.env['resource.calendar.leaves'].sudo().search_read([
+            ('calendar_id', '=', self.id),
+            ('resource_id', '=', False),
+            ('date_from', '<=', datetime.combine(end_date, time.min)),
+            ('date_to', '>=', datetime.combine(start_date, time.min)),
+        ], ['date_from', 'date_to'])
+
+        working_days = 0
+        day = start_date
+        while day <= end_date:
+            day_dt = datetime.combine(day, time.min)
+            if day.weekday() not in (4, 5) and not any(
+                    leave['date_from'].replace(tzinfo=None) <= day_dt <= leave['date_to'].replace(tzinfo=None)
+                    for leave in leaves):
+                working_days += 1
+            day += timedelta(days=1)
+        return working_days
+
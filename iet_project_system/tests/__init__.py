@@ -0,0 +1,4 @@
+from . import test_completion_counters
+from . import test_deadline_reminders
+from . import test_timeline_cache
+from . import test_working_days
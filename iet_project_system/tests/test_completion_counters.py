@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+
+
+class TestCompletionCounters(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Counters Project'})
+        cls.other_project = cls.env['project.project'].create({'name': 'Other Project'})
+        Line = cls.env['project.plan.line']
+        cls.section_1 = Line.create({'name': 'Phase 1', 'project_id': cls.project.id, 'display_type': 'line_section'})
+        cls.task_1 = Line.create({'name': 'Task 1', 'project_id': cls.project.id})
+        cls.task_2 = Line.create({'name': 'Task 2', 'project_id': cls.project.id})
+        cls.section_2 = Line.create({'name': 'Phase 2', 'project_id': cls.project.id, 'display_type': 'line_section'})
+        cls.task_3 = Line.create({'name': 'Task 3', 'project_id': cls.project.id})
+
+    def assertCounters(self, section, total, done):
+        self.assertEqual((section.section_task_count, section.section_done_count), (total, done))
+
+    def test_initial_counters(self):
+        self.assertCounters(self.section_1, 2, 0)
+        self.assertCounters(self.section_2, 1, 0)
+        self.assertEqual(self.project.plan_line_count, 5)
+        self.assertEqual(self.project.plan_line_done_count, 0)
+        self.assertEqual(self.project.completion_percent, 0)
+
+    def test_done_delta(self):
+        self.task_1.status_done = True
+        self.assertCounters(self.section_1, 2, 1)
+        self.assertEqual(self.project.plan_line_done_count, 1)
+        self.assertAlmostEqual(self.project.completion_percent, 20.0)
+        # Writing the same value again must not shift the counters
+        self.task_1.status_done = True
+        self.assertCounters(self.section_1, 2, 1)
+        self.task_1.status_done = False
+        self.assertCounters(self.section_1, 2, 0)
+        self.assertEqual(self.project.plan_line_done_count, 0)
+
+    def test_unlink_and_move(self):
+        self.task_2.status_done = True
+        self.task_2.unlink()
+        self.assertCounters(self.section_1, 1, 0)
+        self.assertEqual(self.project.plan_line_done_count, 0)
+        self.task_3.project_id = self.other_project
+        self.assertCounters(self.section_2, 0, 0)
+        self.assertEqual(self.project.plan_line_count, 3)
+        self.assertEqual(self.other_project.plan_line_count, 1)
+
+    def test_weighted_completion(self):
+        self.section_1.milestone_weight = 60
+        self.section_2.milestone_weight = 40
+        self.task_1.status_done = True
+        self.task_3.status_done = True
+        self.assertAlmostEqual(self.project.completion_percent, 30.0 + 40.0)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase, new_test_user
+
+
+class TestDeadlineReminders(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        cls.manager = new_test_user(cls.env, login='deadline_manager', groups='project.group_project_manager',
+                                    email='deadline.manager@example.com')
+        cls.project = cls.env['project.project'].create({
+            'name': 'Deadline Project',
+            'user_id': cls.manager.id,
+            'end_project_date': cls.today + timedelta(days=5),
+        })
+        cls.later_project = cls.env['project.project'].create({
+            'name': 'Later Project',
+            'user_id': cls.manager.id,
+            'end_project_date': cls.today + timedelta(days=30),
+        })
+
+    def _activities(self, project):
+        return self.env['mail.activity'].search([
+            ('res_model', '=', 'project.project'),
+            ('res_id', '=', project.id),
+            ('user_id', '=', self.manager.id),
+        ])
+
+    def _mails(self):
+        return self.env['mail.mail'].search([
+            ('email_to', '=', self.manager.email),
+            ('subject', 'like', 'Deadline Reminder'),
+        ])
+
+    def test_reminder_sent_once(self):
+        Project = self.env['project.project']
+        Project._cron_send_deadline_notifications()
+        activities = self._activities(self.project)
+        self.assertEqual(len(activities), 1)
+        self.assertEqual(activities.summary, f"Project End ends on {self.project.end_project_date}")
+        self.assertEqual(len(self._mails()), 1)
+        self.assertFalse(self._activities(self.later_project))
+
+        Project._cron_send_deadline_notifications()
+        self.assertEqual(len(self._activities(self.project)), 1)
+        self.assertEqual(len(self._mails()), 1)
+
+    def test_moved_deadline_reminded_again(self):
+        Project = self.env['project.project']
+        Project._cron_send_deadline_notifications()
+        self.project.end_project_date = self.today + timedelta(days=8)
+        Project._cron_send_deadline_notifications()
+        self.assertEqual(len(self._activities(self.project)), 2)
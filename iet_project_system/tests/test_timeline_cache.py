@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+
+
+class TestTimelineCache(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Timeline Project'})
+        cls.other_project = cls.env['project.project'].create({'name': 'Other Project'})
+        Line = cls.env['project.plan.line']
+        cls.section = Line.create({'name': 'Phase 1', 'project_id': cls.project.id, 'display_type': 'line_section'})
+        cls.task_1 = Line.create({'name': 'Task 1', 'project_id': cls.project.id})
+        cls.task_2 = Line.create({'name': 'Task 2', 'project_id': cls.project.id})
+
+    def _get_section(self):
+        data = self.env['project.project'].get_timeline_data([('id', '=', self.project.id)])
+        sections = data['projects'][0]['milestones']
+        self.assertEqual(len(sections), 1)
+        return sections[0]
+
+    def test_cache_after_unlink(self):
+        self.assertEqual(self._get_section()['task_count'], 2)
+        self.task_2.unlink()
+        self.assertEqual(self._get_section()['task_count'], 1)
+
+    def test_cache_after_move(self):
+        self.assertEqual(self._get_section()['task_count'], 2)
+        self.task_2.project_id = self.other_project
+        self.assertEqual(self._get_section()['task_count'], 1)
+
+    def test_cache_after_done(self):
+        self.assertEqual(self._get_section()['done_count'], 0)
+        self.task_1.status_done = True
+        self.assertEqual(self._get_section()['done_count'], 1)
+        self.task_1.status_done = False
+        self.assertEqual(self._get_section()['done_count'], 0)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestWorkingDays(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.calendar = cls.env['resource.calendar'].create({'name': 'Working Days Calendar'})
+        cls.resource = cls.env['resource.resource'].create({'name': 'Resource', 'calendar_id': cls.calendar.id})
+        # Sunday to Saturday: five working days, Friday and Saturday are off
+        cls.week = (date(2025, 1, 5), date(2025, 1, 11))
+
+    def _create_leave(self, day, **vals):
+        return self.env['resource.calendar.leaves'].create({
+            'name': 'Holiday',
+            'calendar_id': self.calendar.id,
+            'date_from': datetime.combine(day, datetime.min.time()),
+            'date_to': datetime.combine(day, datetime.max.time().replace(microsecond=0)),
+            **vals,
+        })
+
+    def test_count_follows_leaves(self):
+        self.assertEqual(self.calendar._count_working_days(*self.week), 5)
+        leave = self._create_leave(date(2025, 1, 7))
+        self.assertEqual(self.calendar._count_working_days(*self.week), 4)
+        leave.write({
+            'date_from': datetime(2025, 1, 14),
+            'date_to': datetime(2025, 1, 14, 23, 59, 59),
+        })
+        self.assertEqual(self.calendar._count_working_days(*self.week), 5)
+        leave.write({
+            'date_from': datetime(2025, 1, 8),
+            'date_to': datetime(2025, 1, 8, 23, 59, 59),
+        })
+        self.assertEqual(self.calendar._count_working_days(*self.week), 4)
+        leave.unlink()
+        self.assertEqual(self.calendar._count_working_days(*self.week), 5)
+
+    def test_resource_leave_ignored(self):
+        stamp = self.calendar._get_leaves_stamp()
+        self._create_leave(date(2025, 1, 7), resource_id=self.resource.id)
+        self.assertEqual(self.calendar._get_leaves_stamp(), stamp)
+        self.assertEqual(self.calendar._count_working_days(*self.week), 5)
+
+    def test_range_outside_table(self):
+        self._create_leave(date(1990, 1, 2))
+        self.assertEqual(self.calendar._count_working_days(date(1989, 12, 31), date(1990, 1, 6)), 4)
+
+    def test_plan_line_durations(self):
+        self.env.company.resource_calendar_id = self.calendar
+        project = self.env['project.project'].create({'name': 'Durations'})
+        line = self.env['project.plan.line'].create({
+            'name': 'Task',
+            'project_id': project.id,
+            'planned_start_date': self.week[0],
+            'planned_end_date': self.week[1],
+        })
+        self.assertEqual(line.planned_duration, 5.0)
+
+    def test_durations_stamp_leaves_once_per_batch(self):
+        self.env.company.resource_calendar_id = self.calendar
+        project = self.env['project.project'].create({'name': 'Batch Durations'})
+        lines = self.env['project.plan.line'].create([{
+            'name': f'Task {index}',
+            'project_id': project.id,
+            'planned_start_date': self.week[0],
+            'planned_end_date': self.week[1],
+            'actual_start_date': self.week[0],
+            'actual_end_date': self.week[1],
+        } for index in range(20)])
+        Calendar = type(self.env['resource.calendar'])
+        stamp = Calendar._get_leaves_stamp
+        calls = []
+
+        def _get_leaves_stamp(calendar):
+            calls.append(calendar.id)
+            return stamp(calendar)
+
+        with patch.object(Calendar, '_get_leaves_stamp', _get_leaves_stamp):
+            lines._compute_durations()
+        self.assertEqual(calls, [self.calendar.id])
+        self.assertEqual(set(lines.mapped('planned_duration')), {5.0})
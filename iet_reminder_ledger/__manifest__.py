@@ -0,0 +1,14 @@
+{
+    'name': 'IET Reminder Ledger',
+    'version': '1.0',
+    'category': 'Productivity',
+    "website": "https://intelligent-experts.com/en/home/",
+    'summary': 'Keep track of sent reminders so scheduled jobs never send them twice',
+    'depends': ['mail'],
+    'data': [
+        'security/ir.model.access.csv',
+    ],
+    'installable': True,
+    'application': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1 @@
+from . import reminder_ledger
@@ -0,0 +1,65 @@
+from odoo import models, fields, api
+from datetime import timedelta
+
+# Entries whose due date is older than this are removed by the autovacuum
+LEDGER_RETENTION_DAYS = 365
+
+
+class ReminderLedger(models.Model):
+    _name = 'reminder.ledger'
+    _description = 'Sent Reminder'
+    _order = 'id desc'
+
+    res_model = fields.Char(string='Model', required=True)
+    res_id = fields.Many2oneReference(string='Record', model_field='res_model', required=True)
+    date_field = fields.Char(string='Date Field', required=True)
+    due_date = fields.Date(string='Due Date', required=True)
+    threshold = fields.Integer(string='Days Before', required=True)
+    partner_id = fields.Many2one('res.partner', string='Recipient', required=True, ondelete='cascade')
+
+    _sql_constraints = [
+        ('reminder_unique', 'unique(res_model, res_id, date_field, due_date, threshold, partner_id)',
+         'This reminder was already sent.'),
+    ]
+
+    @api.model
+    def _get_sent(self, model_name, res_ids, threshold):
+        """Return the ``(res_id, date_field, due_date, partner_id)`` keys already reminded.
+
+        A moved due date is a different key, so it gets reminded again.
+        """
+        if not res_ids:
+            return set()
+        rows = self.sudo().search_read([
+            ('res_model', '=', model_name),
+            ('res_id', 'in', list(res_ids)),
+            ('threshold', '=', threshold),
+        ], ['res_id', 'date_field', 'due_date', 'partner_id'])
+        return {(row['res_id'], row['date_field'], row['due_date'], row['partner_id'][0]) for row in rows}
+
+    @api.model
+    def _log_sent(self, model_name, threshold, keys):
+        """Record the ``(res_id, date_field, due_date, partner_id)`` keys as sent."""
+        return self.sudo().create([{
+            'res_model': model_name,
+            'res_id': res_id,
+            'date_field': date_field,
+            'due_date': due_date,
+            'threshold': threshold,
+            'partner_id': partner_id,
+        } for res_id, date_field, due_date, partner_id in set(keys)])
+
+    @api.model
+    def _forget_sent(self, model_name, res_ids):
+        """Forget every reminder of ``res_ids`` so the next run sends them again (e.g. after a snooze)."""
+        if not res_ids:
+            return
+        self.sudo().search([
+            ('res_model', '=', model_name),
+            ('res_id', 'in', list(res_ids)),
+        ]).unlink()
+
+    @api.autovacuum
+    def _gc_old_entries(self):
+        limit_date = fields.Date.today() - timedelta(days=LEDGER_RETENTION_DAYS)
+        self.sudo().search([('due_date', '<', limit_date)]).unlink()
@@ -20,143 +20,138 @@
 #
 ################################################################################
 import datetime as DT
+import time
+from collections import defaultdict
 from odoo import http
 from odoo.http import request
 
+# Dashboard tiles and the stage names counted in each of them
+DASHBOARD_TILES = {
+    'new': ['Inbox', 'Draft'],
+    'in_progress': ['In Progress'],
+    'canceled': ['Canceled'],
+    'done': ['Done'],
+    'closed': ['Closed'],
+}
+# Number of days covered by each dashboard filter (None: all tickets)
+DASHBOARD_PERIODS = {
+    'all': None,
+    'week': 7,
+    'month': 30,
+    'year': 360,
+}
+# Seconds the counts of a user/company stay cached
+DASHBOARD_CACHE_TTL = 60
+_dashboard_cache = {}
+
 
 class HelpDeskDashboard(http.Controller):
-    """Controller for handling Help Desk dashboard requests."""
+    """Controller for handling Help Desk dashboard requests.
+
+    Every variant reads the counts of one cached ``_read_group`` over
+    (stage, creation day); ticket ids are only returned by
+    ``/helpdesk_dashboard/ticket_ids`` when a tile is opened.
+    """
 
     @http.route(['/helpdesk_dashboard'], type='json', auth="public")
     def helpdesk_dashboard(self):
         """Retrieves statistics for tickets in different stages.
-        Returns:dict: Dashboard statistics including counts and IDs for each
-        stage.
+        Returns:dict: Ticket count of each dashboard tile.
         """
-        stage_names = ['Inbox', 'Draft', 'In Progress', 'Canceled', 'Done',
-                       'Closed']
-        stage_ids = {
-            name: request.env['ticket.stage'].search([('name', '=', name)],
-                                                     limit=1).id for name in
-            stage_names}
-        new_stages = [stage_ids['Inbox'], stage_ids['Draft']]
-        def get_ticket_data(stage_ids):
-            tickets = request.env["ticket.helpdesk"].search(
-                [('stage_id', 'in', stage_ids)])
-            return len(tickets), [ticket.id for ticket in tickets]
-        dashboard_values = {
-            'new': (get_ticket_data(new_stages))[0],
-            'new_id': (get_ticket_data(new_stages))[1],
-            'in_progress': (get_ticket_data([stage_ids['In Progress']]))[0],
-            'in_progress_id': (get_ticket_data([stage_ids['In Progress']]))[1],
-            'canceled': (get_ticket_data([stage_ids['Canceled']]))[0],
-            'canceled_id': (get_ticket_data([stage_ids['Canceled']]))[1],
-            'done': (get_ticket_data([stage_ids['Done']]))[0],
-            'done_id': (get_ticket_data([stage_ids['Done']]))[1],
-            'closed': (get_ticket_data([stage_ids['Closed']]))[0],
-            'closed_id': (get_ticket_data([stage_ids['Closed']]))[1]}
-        return dashboard_values
+        return self._get_dashboard_values('all')
 
+    @http.route(['/helpdesk_dashboard_week'], type='json', auth="public")
     def helpdesk_dashboard_week(self):
         """ Retrieves statistics for tickets created in the past week.
         Returns:
-        dict: Dashboard statistics including counts and IDs for each stage."""
-        today = DT.date.today()
-        week_ago = str(today - DT.timedelta(days=7)) + ' '
-        stage_names = ['Inbox', 'Draft', 'In Progress', 'Canceled', 'Done',
-                       'Closed']
-        stages = {
-            name: request.env['ticket.stage'].search([('name', '=', name)],
-                                                     limit=1).id for name in
-            stage_names}
-        stage_ids = [stages['Inbox'], stages['Draft']]
-        def get_ticket_data(stage_id):
-            count = request.env["ticket.helpdesk"].search_count(
-                [('stage_id', '=', stage_id), ('create_date', '>', week_ago)])
-            ids = request.env["ticket.helpdesk"].search(
-                [('stage_id', '=', stage_id),
-                 ('create_date', '>', week_ago)]).ids
-            return count, ids
-        new_count, new_ids = get_ticket_data(stage_ids)
-        in_progress_count, in_progress_ids = get_ticket_data(
-            stages['In Progress'])
-        canceled_count, canceled_ids = get_ticket_data(stages['Canceled'])
-        done_count, done_ids = get_ticket_data(stages['Done'])
-        closed_count, closed_ids = get_ticket_data(stages['Closed'])
-        dashboard_values = {
-            'new': new_count,
-            'in_progress': in_progress_count,
-            'canceled': canceled_count,
-            'done': done_count,
-            'closed': closed_count,
-            'new_id': new_ids,
-            'in_progress_id': in_progress_ids,
-            'canceled_id': canceled_ids,
-            'done_id': done_ids,
-            'closed_id': closed_ids,
-        }
-        return dashboard_values
+        dict: Ticket count of each dashboard tile."""
+        return self._get_dashboard_values('week')
 
     @http.route(['/helpdesk_dashboard_month'], type='json', auth="public")
     def helpdesk_dashboard_month(self):
         """Retrieves statistics for tickets created in the past month.
         Returns:
-          dict: Dashboard statistics including counts and IDs for each stage."""
-        today = DT.date.today()
-        month_ago = today - DT.timedelta(days=30)
-        week_ago = str(month_ago) + ' '
-        stages = request.env['ticket.stage'].search([('name', 'in',
-                                                      ['Inbox', 'Draft',
-                                                       'In Progress',
-                                                       'Canceled', 'Done',
-                                                       'Closed'])])
-        stage_ids = {stage.name: stage.id for stage in stages}
-        def get_stage_data(stage_names):
-            stage_ids_list = [stage_ids[name] for name in stage_names]
-            tickets = request.env["ticket.helpdesk"].search(
-                [('stage_id', 'in', stage_ids_list),
-                 ('create_date', '>', week_ago)])
-            return len(tickets), [ticket.id for ticket in tickets]
-        new_count, new_ids = get_stage_data(['Inbox', 'Draft'])
-        in_progress_count, in_progress_ids = get_stage_data(['In Progress'])
-        canceled_count, canceled_ids = get_stage_data(['Canceled'])
-        done_count, done_ids = get_stage_data(['Done'])
-        closed_count, closed_ids = get_stage_data(['Closed'])
-        dashboard_values = {
-            'new': new_count,
-            'in_progress': in_progress_count,
-            'canceled': canceled_count,
-            'done': done_count,
-            'closed': closed_count,
-            'new_id': new_ids,
-            'in_progress_id': in_progress_ids,
-            'canceled_id': canceled_ids,
-            'done_id': done_ids,
-            'closed_id': closed_ids,
-        }
-        return dashboard_values
+          dict: Ticket count of each dashboard tile."""
+        return self._get_dashboard_values('month')
 
     @http.route(['/helpdesk_dashboard_year'], type='json', auth="public")
     def helpdesk_dashboard_year(self):
         """Retrieves statistics for tickets created in the past year.
         Returns:
-            dict: Dashboard statistics including counts and IDs for each stage.
+            dict: Ticket count of each dashboard tile.
         """
-        today = DT.date.today()
-        year_ago = today - DT.timedelta(days=360)
-        stages = ['Inbox', 'Draft', 'In Progress', 'Canceled', 'Done', 'Closed']
-        stage_ids = {
-            stage: request.env['ticket.stage'].search([('name', '=', stage)],
-                                                      limit=1).id for stage in
-            stages}
-        def get_ticket_data(stage_name):
-            stage_id = stage_ids[stage_name]
-            tickets = request.env["ticket.helpdesk"].search(
-                [('stage_id', '=', stage_id), ('create_date', '>', year_ago)])
-            return len(tickets), [ticket.id for ticket in tickets]
-        dashboard_values = {}
+        return self._get_dashboard_values('year')
+
+    @http.route(['/helpdesk_dashboard/ticket_ids'], type='json', auth="public")
+    def helpdesk_dashboard_ticket_ids(self, tile, period='all'):
+        """Retrieves the tickets of a dashboard tile when it is clicked.
+        Returns:
+            list: Ids of the tickets counted in the tile.
+        """
+        if tile not in DASHBOARD_TILES or period not in DASHBOARD_PERIODS:
+            return []
+        stage_ids = self._get_dashboard_stages()[tile]
+        domain = [('stage_id', 'in', stage_ids)]
+        date_from = self._get_period_start(period)
+        if date_from:
+            domain.append(('create_date', '>=', date_from))
+        return request.env['ticket.helpdesk'].search(domain).ids
+
+    def _get_dashboard_stages(self):
+        """Stage ids of each dashboard tile, from one search on the stage names."""
+        stage_names = [name for names in DASHBOARD_TILES.values() for name in names]
+        stages = request.env['ticket.stage'].search_read(
+            [('name', 'in', stage_names)], ['name'])
+        ids_by_name = defaultdict(list)
         for stage in stages:
-            count, ids = get_ticket_data(stage)
-            dashboard_values[stage.lower()] = count
-            dashboard_values[f'{stage.lower()}_id'] = ids
-        return dashboard_values
+            ids_by_name[stage['name']].append(stage['id'])
+        return {
+            tile: [stage_id for name in names for stage_id in ids_by_name[name]]
+            for tile, names in DASHBOARD_TILES.items()
+        }
+
+    def _get_period_start(self, period):
+        days = DASHBOARD_PERIODS[period]
+        return DT.date.today() - DT.timedelta(days=days) if days else None
+
+    def _get_dashboard_values(self, period):
+        """Ticket count of each tile for tickets created since the period start."""
+        date_from = self._get_period_start(period)
+        values = {tile: 0 for tile in DASHBOARD_TILES}
+        for (tile, day), count in self._get_dashboard_counts().items():
+            if not date_from or day >= date_from:
+                values[tile] += count
+        return values
+
+    def _get_dashboard_counts(self):
+        """Ticket count per (tile, creation day), cached per user and company.
+
+        One ``_read_group`` over (stage, create_date:day) serves all the
+        dashboard periods.
+        """
+        env = request.env
+        key = (env.cr.dbname, env.uid, env.company.id)
+        cached = _dashboard_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        tile_by_stage = {
+            stage_id: tile
+            for tile, stage_ids in self._get_dashboard_stages().items()
+            for stage_id in stage_ids
+        }
+        counts = defaultdict(int)
+        groups = env['ticket.helpdesk']._read_group(
+            [('stage_id', 'in', list(tile_by_stage))],
+            ['stage_id', 'create_date:day'], ['__count'])
+        for stage, day, count in groups:
+            if isinstance(day, DT.datetime):
+                day = day.date()
+            counts[tile_by_stage[stage.id], day] += count
+
+        # Drop expired entries so the cache does not grow with every user
+        now = time.monotonic()
+        for expired in [k for k, (expiry, _counts) in _dashboard_cache.items() if expiry <= now]:
+            _dashboard_cache.pop(expired, None)
+        _dashboard_cache[key] = (now + DASHBOARD_CACHE_TTL, counts)
+        return counts
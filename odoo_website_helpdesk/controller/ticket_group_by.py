@@ -21,60 +21,95 @@
 ################################################################################
 from odoo import http
 from odoo.http import request
+from odoo.addons.odoo_website_helpdesk.models.ticket_helpdesk import \
+    PORTAL_GROUP_LIMIT
+
+# Value of the portal group by selection and the ticket field it groups on
+GROUP_BY_FIELDS = {
+    '0': None,
+    '1': 'stage_id',
+    '2': 'ticket_type_id',
+}
 
 
 class TicketGroupBy(http.Controller):
     """Controller for handling ticket grouping based on different criteria."""
 
+    def _get_group_domain(self):
+        return [('user_id', '=', request.env.user.id)]
+
     @http.route(['/ticketgroupby'], type='json', auth="public", website=True)
     def ticket_group_by(self, **kwargs):
         """grouping tickets based on user-defined criteria.
         Args:
         - kwargs (dict): Keyword arguments received from the HTTP request.
         Returns:
-        - http.Response: Rendered HTTP response containing grouped ticket information.
+        - http.Response: Rendered HTTP response containing grouped ticket
+          information, with the first page of tickets of each group.
         """
-        context = []
         group_value = kwargs.get("search_value")
-        if group_value == '0':
-            context = []
-            tickets = request.env["ticket.helpdesk"].search(
-                [('user_id', '=', request.env.user.id)])
-            if tickets:
-                context.append({
-                    'name': '',
-                    'data': tickets
-                })
-        if group_value == '1':
-            context = []
-            stage_ids = request.env['ticket.stage'].search([])
-            for stage in stage_ids:
-                ticket_ids = request.env['ticket.helpdesk'].search([
-                    ('stage_id', '=', stage.id),
-                    ('user_id', '=', request.env.user.id)
-                ])
-                if ticket_ids:
-                    context.append({
-                        'name': stage.name,
-                        'data': ticket_ids
-                    })
-        if group_value == '2':
-            context = []
-            type_ids = request.env['helpdesk.type'].search([])
-            for types in type_ids:
-                ticket_ids_1 = request.env['ticket.helpdesk'].search([
-                    ('ticket_type_id', '=', types.id),
-                    ('user_id', '=', request.env.user.id)
-                ])
-                if ticket_ids_1:
-                    context.append({
-                        'name': types.name,
-                        'data': ticket_ids_1
-                    })
+        if group_value not in GROUP_BY_FIELDS:
+            group_value = '0'
+        groupby = GROUP_BY_FIELDS[group_value]
+        Ticket = request.env["ticket.helpdesk"]
+        groups = Ticket._read_portal_groups(self._get_group_domain(), groupby)
+        names = {}
+        if groupby:
+            comodel = request.env[Ticket._fields[groupby].comodel_name]
+            # search keeps the order of the stages/types
+            group_records = comodel.search(
+                [('id', 'in', [group_id for group_id, _count, _tickets in groups])])
+            names = {record.id: record.name for record in group_records}
+            order = {record.id: index for index, record in enumerate(group_records)}
+            groups = sorted([group for group in groups if group[0] in order],
+                            key=lambda group: order[group[0]])
+        context = [{
+            'name': names.get(group_id, ''),
+            'group_id': group_id or 0,
+            'count': count,
+            'data': tickets,
+            'next_page': 2 if count > len(tickets) else False,
+        } for group_id, count, tickets in groups]
         values = {
             'tickets': context,
+            'group_value': group_value,
         }
         response = http.Response(
             template='odoo_website_helpdesk.ticket_group_by_table',
             qcontext=values)
         return response.render()
+
+    @http.route(['/ticketgroupby/page'], type='json', auth="public",
+                website=True)
+    def ticket_group_by_page(self, search_value, group_id=0, page=2):
+        """Next tickets of one group, loaded when "Load more" is clicked.
+        Returns:
+        - http.Response: Rendered rows of the group page.
+        """
+        groupby = GROUP_BY_FIELDS.get(search_value)
+        try:
+            page = max(int(page), 1)
+        except (TypeError, ValueError):
+            page = 1
+        try:
+            group_id = int(group_id)
+        except (TypeError, ValueError):
+            group_id = 0
+        domain = self._get_group_domain()
+        if groupby:
+            domain.append((groupby, '=', group_id))
+        tickets = request.env["ticket.helpdesk"].search(
+            domain, offset=(page - 1) * PORTAL_GROUP_LIMIT,
+            limit=PORTAL_GROUP_LIMIT + 1, order='id desc')
+        values = {
+            'group': {
+                'group_id': group_id,
+                'data': tickets[:PORTAL_GROUP_LIMIT],
+                'next_page': page + 1 if len(tickets) > PORTAL_GROUP_LIMIT else False,
+            },
+            'group_value': search_value,
+        }
+        response = http.Response(
+            template='odoo_website_helpdesk.ticket_group_by_rows',
+            qcontext=values)
+        return response.render()
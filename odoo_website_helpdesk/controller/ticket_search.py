@@ -21,6 +21,8 @@
 ################################################################################
 from odoo import http
 from odoo.http import request
+from odoo.addons.odoo_website_helpdesk.models.ticket_helpdesk import \
+    PORTAL_SEARCH_LIMIT
 
 
 class TicketSearch(http.Controller):
@@ -30,15 +32,24 @@ class TicketSearch(http.Controller):
         Search for tickets based on the provided search value.
         :param search_value: The value to search for in the ticket name or subject.
         :type search_value: str
-        :return: A JSON response containing the matching tickets.
+        :param page: The page of results to render, starting at 1.
+        :type page: int
+        :return: A JSON response containing one page of the matching tickets.
         :rtype: http.Response
         """
-        search_value = kwargs.get("search_value")
-        tickets = request.env["ticket.helpdesk"].search(
-            ['|', ('name', 'ilike', search_value),
-             ('subject', 'ilike', search_value)])
+        search_value = (kwargs.get("search_value") or '').strip()
+        try:
+            page = max(int(kwargs.get("page") or 1), 1)
+        except (TypeError, ValueError):
+            page = 1
+        # One extra ticket tells whether a next page exists without a COUNT
+        tickets = request.env["ticket.helpdesk"]._search_portal_tickets(
+            search_value, offset=(page - 1) * PORTAL_SEARCH_LIMIT,
+            limit=PORTAL_SEARCH_LIMIT + 1)
         values = {
-            'tickets': tickets,
+            'tickets': tickets[:PORTAL_SEARCH_LIMIT],
+            'search_page': page,
+            'search_has_next': len(tickets) > PORTAL_SEARCH_LIMIT,
         }
         response = http.Response(template='odoo_website_helpdesk.ticket_table',
                                  qcontext=values)
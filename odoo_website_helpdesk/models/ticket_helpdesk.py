@@ -20,9 +20,12 @@
 #
 ################################################################################
 import logging
+import threading
+from datetime import timedelta
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import SQL, escape_psql
 
 _logger = logging.getLogger(__name__)
 
@@ -41,6 +44,12 @@ RATING = [
     ('4', 'Very High'),
     ('5', 'Extreme High')
 ]
+# Tickets closed per committed batch of the auto close cron
+AUTO_CLOSE_BATCH_SIZE = 500
+# Tickets per page of the portal search
+PORTAL_SEARCH_LIMIT = 20
+# Tickets shown per group before "Load more" in the portal group by
+PORTAL_GROUP_LIMIT = 20
 
 
 class TicketHelpDesk(models.Model):
@@ -59,14 +68,14 @@ class TicketHelpDesk(models.Model):
         return self.env['ir.config_parameter'].sudo().get_param(
             'odoo_website_helpdesk.show_category')
 
-    name = fields.Char('Name', default=lambda self: self.env['ir.sequence'].
+    name = fields.Char('Name', index='trigram', default=lambda self: self.env['ir.sequence'].
                        next_by_code('ticket.helpdesk') or _('New'),
                        help='Ticket Name')
     customer_id = fields.Many2one('res.partner',
                                   string='Customer Name',
                                   help='Customer Name')
     customer_name = fields.Char('Customer Name', help='Customer Name')
-    subject = fields.Text('Subject', required=True,
+    subject = fields.Text('Subject', required=True, index='trigram',
                           help='Subject of the Ticket')
     description = fields.Text('Description', required=True,
                               help='Description')
@@ -220,21 +229,50 @@ class TicketHelpDesk(models.Model):
         for record in self:
             record.show_create_task = show_create_task
 
+    @api.model
     def auto_close_ticket(self):
-        """Automatically closing the ticket"""
+        """Automatically closing the ticket
+
+        Tickets older than the configured number of days and not already in
+        a closing or cancel stage are moved to the closing stage in batches
+        of AUTO_CLOSE_BATCH_SIZE: one write per batch, the stage mails queued
+        for the mail cron, then a commit.
+        """
         auto_close = self.env['ir.config_parameter'].sudo().get_param(
             'odoo_website_helpdesk.auto_close_ticket')
-        if auto_close:
-            no_of_days = self.env['ir.config_parameter'].sudo().get_param(
-                'odoo_website_helpdesk.no_of_days')
-            records = self.env['ticket.helpdesk'].search([])
-            for rec in records:
-                days = (fields.Datetime.today() - rec.create_date).days
-                if days >= int(no_of_days):
-                    close_stage_id = self.env['ticket.stage'].search(
-                        [('closing_stage', '=', True)])
-                    if close_stage_id:
-                        rec.stage_id = close_stage_id
+        no_of_days = self.env['ir.config_parameter'].sudo().get_param(
+            'odoo_website_helpdesk.no_of_days')
+        if not auto_close or not no_of_days:
+            return
+        close_stage = self.env['ticket.stage'].search(
+            [('closing_stage', '=', True)], limit=1)
+        if not close_stage:
+            return
+        closed_stages = self.env['ticket.stage'].search(
+            ['|', ('closing_stage', '=', True), ('cancel_stage', '=', True)])
+        domain = [
+            ('create_date', '<', fields.Datetime.now() - timedelta(
+                days=int(no_of_days))),
+            ('stage_id', 'not in', closed_stages.ids),
+        ]
+        closed = 0
+        while True:
+            tickets = self.search(domain, limit=AUTO_CLOSE_BATCH_SIZE)
+            if not tickets:
+                break
+            now = fields.Datetime.now()
+            tickets.write({
+                'stage_id': close_stage.id,
+                'last_update_date': now,
+                'end_date': now,
+            })
+            if close_stage.template_id:
+                close_stage.template_id.send_mail_batch(tickets.ids)
+            closed += len(tickets)
+            # No commit inside tests
+            if not getattr(threading.current_thread(), 'testing', False):
+                self.env.cr.commit()
+        _logger.info("Auto closed %s helpdesk tickets", closed)
 
     def default_stage_id(self):
         """Method to return the default stage"""
@@ -248,6 +286,79 @@ class TicketHelpDesk(models.Model):
         stage_ids = self.env['ticket.stage'].search([])
         return stage_ids
 
+    @api.model
+    def _search_portal_tickets(self, search_value, offset=0,
+                               limit=PORTAL_SEARCH_LIMIT):
+        """Tickets whose name or subject contains the search value, best
+        matches first.
+
+        Name and subject carry trigram indexes, so the ilike filter does not
+        scan the table. With pg_trgm the matches are ranked by word
+        similarity, otherwise exact then prefix matches of the name come
+        first. Ties are ordered by the newest ticket.
+        """
+        if not search_value:
+            return self.search([], offset=offset, limit=limit,
+                               order='id desc')
+        query = self._search(
+            ['|', ('name', 'ilike', search_value),
+             ('subject', 'ilike', search_value)],
+            offset=offset, limit=limit)
+        name = SQL.identifier(self._table, 'name')
+        subject = SQL.identifier(self._table, 'subject')
+        if self.env.registry.has_trigram:
+            rank = SQL(
+                "GREATEST(word_similarity(%s, %s), "
+                "word_similarity(%s, COALESCE(%s, ''))) DESC",
+                search_value, name, search_value, subject)
+        else:
+            rank = SQL(
+                "CASE WHEN LOWER(%s) = LOWER(%s) THEN 0 "
+                "WHEN %s ILIKE %s THEN 1 ELSE 2 END",
+                name, search_value, name, escape_psql(search_value) + '%')
+        query.order = SQL("%s, %s DESC", rank,
+                          SQL.identifier(self._table, 'id'))
+        return self.browse(query.get_result_ids())
+
+    @api.model
+    def _read_portal_groups(self, domain, groupby=None,
+                            limit=PORTAL_GROUP_LIMIT):
+        """Ticket count and newest tickets of each group, in one query.
+
+        Returns a list of (group id, count, tickets) with at most ``limit``
+        tickets per group, ordered by group id. The group id is None when
+        ``groupby`` is not given; tickets without a group are left out.
+        """
+        if groupby:
+            domain = domain + [(groupby, '!=', False)]
+        query = self._search(domain)
+        if query.is_empty():
+            return []
+        ticket_id = SQL.identifier(self._table, 'id')
+        group = SQL.identifier(self._table, groupby) if groupby \
+            else SQL("NULL::int")
+        self.env.cr.execute(SQL("""
+            SELECT group_id, id, total
+              FROM (%s) AS ranked
+             WHERE rank <= %s
+          ORDER BY group_id, rank
+        """, query.select(SQL(
+            "%s AS group_id, %s AS id, "
+            "ROW_NUMBER() OVER (PARTITION BY %s ORDER BY %s DESC) AS rank, "
+            "COUNT(*) OVER (PARTITION BY %s) AS total",
+            group, ticket_id, group, ticket_id, group)), limit))
+        rows = self.env.cr.fetchall()
+        tickets = self.browse([row[1] for row in rows])
+        groups = {}
+        for group_id, ticket, total in rows:
+            groups.setdefault(group_id, (total, []))[1].append(ticket)
+        # All groups share one prefetch set: their fields are read together
+        return [
+            (group_id, count,
+             self.browse(ids).with_prefetch(tickets._prefetch_ids))
+            for group_id, (count, ids) in groups.items()
+        ]
+
     @api.model_create_multi
     def create(self, vals_list):
         """Create function"""
@@ -6,6 +6,8 @@ publicWidget.registry.TT = publicWidget.Widget.extend({
     events: {
          'change #group_select': '_onGroupSelectChange',
         'click #search_ticket': '_onSubmit',
+        'click .o_ticket_search_page': '_onSearchPage',
+        'click .o_ticket_group_more': '_onGroupLoadMore',
     },
 //        GroupBy filtering the portal tickets
         _onGroupSelectChange: function (ev) {
@@ -17,13 +19,32 @@ publicWidget.registry.TT = publicWidget.Widget.extend({
                   $('.search_ticket').html(result);
             });
         },
+//        Loading the next tickets of one group
+    _onGroupLoadMore(ev) {
+       var $button = $(ev.currentTarget);
+       rpc('/ticketgroupby/page', {
+                'search_value': String($button.data('group-value')),
+                'group_id': $button.data('group-id'),
+                'page': $button.data('page'),
+            }).then(function(result) {
+                $button.closest('tr').replaceWith(result);
+            });
+    },
 //        Searching the portal tickets
     _onSubmit(ev) {
+       this._searchTickets(1);
+    },
+//        Loading another page of the search results
+    _onSearchPage(ev) {
+       this._searchTickets($(ev.currentTarget).data('page'));
+    },
+    _searchTickets(page) {
        var search_value = this.$el.find('#search_box').val();
        rpc('/ticketsearch', {
                 'search_value': search_value,
+                'page': page,
             }).then(function(result) {
-                $('.search_ticket').html(result);
+                $('.search_ticket').replaceWith(result);
             });
     }
 })
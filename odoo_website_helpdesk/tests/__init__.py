@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+from . import test_portal_search
+from . import test_portal_group_by
+from . import test_dashboard
+from . import test_auto_close
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestAutoClose(TransactionCase):
+    """Auto close cron of the old helpdesk tickets."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        params = cls.env['ir.config_parameter'].sudo()
+        params.set_param('odoo_website_helpdesk.auto_close_ticket', True)
+        params.set_param('odoo_website_helpdesk.no_of_days', 10)
+        cls.closed_stage = cls.env.ref('odoo_website_helpdesk.stage_closed')
+        cls.canceled_stage = cls.env.ref('odoo_website_helpdesk.stage_canceled')
+        cls.in_progress = cls.env.ref('odoo_website_helpdesk.stage_in_progress')
+        Ticket = cls.env['ticket.helpdesk']
+        cls.old_tickets = Ticket.create([{
+            'subject': 'Old',
+            'description': 'Old',
+            'stage_id': cls.in_progress.id,
+        } for _index in range(5)])
+        cls.canceled = Ticket.create({
+            'subject': 'Canceled',
+            'description': 'Canceled',
+            'stage_id': cls.canceled_stage.id,
+        })
+        cls.recent = Ticket.create({
+            'subject': 'Recent',
+            'description': 'Recent',
+            'stage_id': cls.in_progress.id,
+        })
+        cls.env.flush_all()
+        cls.env.cr.execute("""
+            UPDATE ticket_helpdesk
+               SET create_date = create_date - INTERVAL '30 days'
+             WHERE id IN %s
+        """, [tuple((cls.old_tickets | cls.canceled).ids)])
+        cls.env.invalidate_all()
+
+    def test_auto_close_in_batches(self):
+        with patch('odoo.addons.odoo_website_helpdesk.models.ticket_helpdesk.'
+                   'AUTO_CLOSE_BATCH_SIZE', 2):
+            self.env['ticket.helpdesk'].auto_close_ticket()
+        self.assertEqual(set(self.old_tickets.mapped('stage_id')), {self.closed_stage})
+        self.assertTrue(all(self.old_tickets.mapped('end_date')))
+        self.assertEqual(self.canceled.stage_id, self.canceled_stage)
+        self.assertEqual(self.recent.stage_id, self.in_progress)
+
+    def test_auto_close_disabled(self):
+        self.env['ir.config_parameter'].sudo().set_param(
+            'odoo_website_helpdesk.auto_close_ticket', False)
+        self.env['ticket.helpdesk'].auto_close_ticket()
+        self.assertEqual(set(self.old_tickets.mapped('stage_id')), {self.in_progress})
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import HttpCase, tagged
+from odoo.addons.odoo_website_helpdesk.controller.odoo_website_helpdesk \
+    import _dashboard_cache
+
+
+@tagged('post_install', '-at_install')
+class TestDashboard(HttpCase):
+    """Helpdesk dashboard counts served from the cached grouped query."""
+
+    def setUp(self):
+        super().setUp()
+        _dashboard_cache.clear()
+        self.addCleanup(_dashboard_cache.clear)
+        self.authenticate('admin', 'admin')
+
+    def _create_tickets(self, count, days_old=0):
+        tickets = self.env['ticket.helpdesk'].create([{
+            'subject': 'Dashboard',
+            'description': 'Dashboard',
+            'stage_id': self.env.ref('odoo_website_helpdesk.stage_in_progress').id,
+        } for _index in range(count)])
+        if days_old:
+            self.env.flush_all()
+            self.env.cr.execute("""
+                UPDATE ticket_helpdesk
+                   SET create_date = create_date - make_interval(days => %s)
+                 WHERE id IN %s
+            """, [days_old, tuple(tickets.ids)])
+            tickets.invalidate_recordset(['create_date'])
+        return tickets
+
+    def _counts(self, route='/helpdesk_dashboard'):
+        _dashboard_cache.clear()
+        return self.make_jsonrpc_request(route, {})
+
+    def test_counts_by_period(self):
+        before = {route: self._counts(route) for route in (
+            '/helpdesk_dashboard', '/helpdesk_dashboard_week', '/helpdesk_dashboard_year')}
+        self._create_tickets(2)
+        self._create_tickets(1, days_old=100)
+        self.assertEqual(self._counts()['in_progress'],
+                         before['/helpdesk_dashboard']['in_progress'] + 3)
+        self.assertEqual(self._counts('/helpdesk_dashboard_week')['in_progress'],
+                         before['/helpdesk_dashboard_week']['in_progress'] + 2)
+        self.assertEqual(self._counts('/helpdesk_dashboard_year')['in_progress'],
+                         before['/helpdesk_dashboard_year']['in_progress'] + 3)
+
+    def test_counts_cached(self):
+        before = self._counts()
+        self._create_tickets(1)
+        # Same user and company within the TTL: the cached counts are served
+        self.assertEqual(self.make_jsonrpc_request('/helpdesk_dashboard', {}), before)
+
+    def test_tile_ticket_ids(self):
+        recent = self._create_tickets(1)
+        old = self._create_tickets(1, days_old=100)
+        ids = self.make_jsonrpc_request('/helpdesk_dashboard/ticket_ids', {
+            'tile': 'in_progress', 'period': 'week'})
+        self.assertIn(recent.id, ids)
+        self.assertNotIn(old.id, ids)
+        self.assertEqual(self.make_jsonrpc_request('/helpdesk_dashboard/ticket_ids', {
+            'tile': 'unknown'}), [])
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import HttpCase, tagged
+from odoo.addons.odoo_website_helpdesk.models.ticket_helpdesk import \
+    PORTAL_GROUP_LIMIT
+
+
+@tagged('post_install', '-at_install')
+class TestPortalGroupBy(HttpCase):
+    """Grouped portal tickets and their "Load more" pages."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = cls.env.ref('base.user_admin')
+        cls.stage = cls.env['ticket.stage'].create({'name': 'Portal Group Stage'})
+        cls.tickets = cls.env['ticket.helpdesk'].create([{
+            'name': 'GRP-%03d' % index,
+            'subject': 'Grouped',
+            'description': 'Grouped',
+            'stage_id': cls.stage.id,
+            'user_id': cls.admin.id,
+        } for index in range(PORTAL_GROUP_LIMIT + 3)])
+
+    def test_read_portal_groups(self):
+        groups = self.env['ticket.helpdesk']._read_portal_groups(
+            [('user_id', '=', self.admin.id)], 'stage_id')
+        group = next(group for group in groups if group[0] == self.stage.id)
+        self.assertEqual(group[1], len(self.tickets))
+        # Newest tickets first, the others are loaded page by page
+        self.assertEqual(group[2], self.tickets[::-1][:PORTAL_GROUP_LIMIT])
+
+    def test_next_page(self):
+        self.authenticate('admin', 'admin')
+        html = self.make_jsonrpc_request('/ticketgroupby/page', {
+            'search_value': '1', 'group_id': self.stage.id, 'page': 2})
+        for ticket in self.tickets[:3]:
+            self.assertIn(ticket.name, html)
+        self.assertNotIn(self.tickets[-1].name, html)
+
+    def test_invalid_page_and_group(self):
+        self.authenticate('admin', 'admin')
+        html = self.make_jsonrpc_request('/ticketgroupby/page', {
+            'search_value': '1', 'group_id': 'abc', 'page': 'abc'})
+        self.assertNotIn('GRP-', html)
+        html = self.make_jsonrpc_request('/ticketgroupby/page', {
+            'search_value': '1', 'group_id': self.stage.id, 'page': 'abc'})
+        self.assertIn(self.tickets[-1].name, html)
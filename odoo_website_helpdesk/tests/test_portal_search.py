@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import HttpCase, tagged
+from odoo.addons.odoo_website_helpdesk.models.ticket_helpdesk import \
+    PORTAL_SEARCH_LIMIT
+
+
+@tagged('post_install', '-at_install')
+class TestPortalSearch(HttpCase):
+    """Ranking and pagination of the portal ticket search."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Ticket = cls.env['ticket.helpdesk']
+        cls.tickets = Ticket.create([{
+            'name': 'ZQX-%03d' % index,
+            'subject': 'Printer out of paper',
+            'description': 'Printer',
+        } for index in range(PORTAL_SEARCH_LIMIT + 5)])
+        cls.exact = Ticket.create({
+            'name': 'ZQX',
+            'subject': 'Scanner',
+            'description': 'Scanner',
+        })
+
+    def test_exact_name_first(self):
+        tickets = self.env['ticket.helpdesk']._search_portal_tickets('ZQX')
+        self.assertEqual(tickets[0], self.exact)
+        self.assertEqual(len(tickets), PORTAL_SEARCH_LIMIT)
+
+    def test_pages(self):
+        Ticket = self.env['ticket.helpdesk']
+        first = Ticket._search_portal_tickets('ZQX')
+        second = Ticket._search_portal_tickets('ZQX', offset=PORTAL_SEARCH_LIMIT)
+        self.assertFalse(first & second)
+        self.assertEqual(len(first | second), len(self.tickets | self.exact))
+
+    def test_invalid_page(self):
+        self.authenticate('admin', 'admin')
+        for page in ('abc', None, -3):
+            html = self.make_jsonrpc_request('/ticketsearch', {
+                'search_value': 'ZQX', 'page': page})
+            self.assertIn('ZQX', html)
+            self.assertNotIn('Previous', html)